@@ -0,0 +1,137 @@
+# benchmarks/json_render.py
+"""
+Postgres-built JSON (GET /items/?render=postgres) vs the Python serializer.
+
+    python -m benchmarks.json_render [--repeat 20]
+
+First a golden check: for a set of list requests (full rows, ?fields=,
+filters, offset and cursor pages in both sort directions) both renderings
+must decode to the same documents and give the same next cursor. Then both
+are timed for 50, 1,000 and 10,000-row pages: worker CPU per row, and wall
+time per page (which includes the work moved into Postgres).
+
+Runs against DATABASE_URL inside a transaction that is rolled back.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.list_paths import SIZES, seed
+from src.core.config import settings
+from src.core.database import engine
+from src.crud.baseitem import ItemRepository
+from src.crud.basestudent import StudentRepository
+from src.schemas.fields import dump_rows
+
+# (fields, sort, filters) for the golden check
+GOLDEN = {
+    ItemRepository: [
+        (None, "id", []),
+        (None, "-created_at", []),
+        (("id", "name", "price"), "-id", []),
+        (("created_at",), "created_at", [("price[gte]", "50")]),
+        (("id", "price"), "-created_at,id", []),
+        (None, "id", [("name[like]", "nothing matches this")]),
+    ],
+    StudentRepository: [
+        (None, "id", []),
+        (("id", "name"), "-id", []),
+        (None, "id", [("name[like]", "nothing matches this")]),
+    ],
+}
+
+
+async def python_page(repo, fields, sort, where, limit, cursor=None):
+    fields = fields or repo.row_fields()
+    rows, next_cursor = await repo.get_page(
+        limit=limit, cursor=cursor, order_by=sort, fields=fields, where=where
+    )
+    return dump_rows(fields, rows), next_cursor
+
+
+async def check_golden(session: AsyncSession) -> None:
+    for repository, cases in GOLDEN.items():
+        repo = repository(session)
+        for fields, sort, params in cases:
+            repo.check_sort(sort)  # only sorts the API accepts
+            where = repo.build_filters(params)
+            label = f"{repo.model.__name__} fields={fields} sort={sort} {params}"
+
+            columns = fields or repo.row_fields()
+            rows = await repo.get_all(skip=3, limit=40, order_by=sort, fields=columns, where=where)
+            expected = json.loads(dump_rows(columns, rows))
+            body, returned = await repo.get_all_json(
+                skip=3, limit=40, order_by=sort, fields=fields, where=where
+            )
+            assert json.loads(body) == expected, f"offset page differs: {label}"
+            assert returned == len(expected), f"offset count differs: {label}"
+
+            # walk a few cursor pages with both renderings side by side
+            cursor = None
+            for _ in range(3):
+                expected, expected_cursor = await python_page(repo, fields, sort, where, 25, cursor)
+                body, returned, next_cursor = await repo.get_page_json(
+                    limit=25, cursor=cursor, order_by=sort, fields=fields, where=where
+                )
+                assert json.loads(body) == json.loads(expected), f"cursor page differs: {label}"
+                assert next_cursor == expected_cursor, f"next cursor differs: {label}"
+                assert returned == len(json.loads(body)), f"cursor count differs: {label}"
+                if next_cursor is None:
+                    break
+                cursor = next_cursor
+            print(f"ok  {label}")
+
+
+async def python_render(session: AsyncSession, size: int) -> bytes:
+    repo = ItemRepository(session)
+    fields = repo.row_fields()
+    return dump_rows(fields, await repo.get_all(limit=size, fields=fields))
+
+
+async def postgres_render(session: AsyncSession, size: int) -> bytes:
+    body, _ = await ItemRepository(session).get_all_json(limit=size)
+    return body
+
+
+async def measure(render, session: AsyncSession, size: int, repeat: int):
+    """
+    (worker CPU microseconds per row, wall milliseconds per page).
+    """
+    await render(session, size)  # warm the statement caches
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(repeat):
+        await render(session, size)
+    cpu = (time.process_time() - cpu) / repeat
+    wall = (time.perf_counter() - wall) / repeat
+    return cpu / size * 1e6, wall * 1e3
+
+
+async def run(repeat: int) -> None:
+    # statement logging and slow-query EXPLAINs would skew the numbers
+    engine.sync_engine.echo = False
+    settings.SLOW_QUERY_MS = 0
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await seed(conn, max(SIZES))
+            session = AsyncSession(bind=conn)
+            await check_golden(session)
+
+            print(f"\n{'rows':>6}  {'render':<8}  {'cpu us/row':>10}  {'wall ms':>8}")
+            for size in SIZES:
+                for name, render in (("python", python_render), ("postgres", postgres_render)):
+                    cpu, wall = await measure(render, session, size, repeat)
+                    print(f"{size:>6}  {name:<8}  {cpu:>10.2f}  {wall:>8.2f}")
+        finally:
+            await transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per page size")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
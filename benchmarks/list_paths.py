@@ -0,0 +1,116 @@
+# benchmarks/list_paths.py
+"""
+ORM path vs raw-row path for one page of GET /items/: CPU time and peak
+memory per row, for pages of 50, 1,000 and 10,000 rows.
+
+    python -m benchmarks.list_paths [--repeat 20]
+
+orm: select(Item) -> Item instances in the identity map -> ItemOut
+     validation (from_attributes) -> JSON
+raw: Core select over the columns -> Row tuples -> JSON (dump_rows)
+
+Runs against DATABASE_URL. The rows it needs are inserted in a transaction
+that is rolled back at the end, so the database is left as it was.
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import engine
+from src.crud.baseitem import ItemRepository
+from src.models.item import Item
+from src.models.student import Student
+from src.schemas.fields import dump_list, dump_rows
+from src.schemas.item import ItemOut
+
+SIZES = (50, 1000, 10000)
+
+
+async def seed(conn, count: int) -> int:
+    """
+    Insert one student owning `count` items; returns the student id.
+    """
+    result = await conn.execute(
+        insert(Student).values(name="Benchmark", age=20, grade="A").returning(Student.id)
+    )
+    student_id = result.scalar_one()
+    await conn.execute(insert(Item), [
+        {
+            "name": f"item {i}",
+            "description": "benchmark row",
+            "price": 9.99 + i,
+            "quantity": i % 100,
+            "student_id": student_id,
+        }
+        for i in range(count)
+    ])
+    return student_id
+
+
+async def orm_page(session: AsyncSession, size: int) -> bytes:
+    items = await ItemRepository(session).get_all(limit=size)
+    body = dump_list(ItemOut, items)
+    # every request gets a fresh session, so don't let the identity map carry over
+    session.expunge_all()
+    return body
+
+
+async def raw_page(session: AsyncSession, size: int) -> bytes:
+    repo = ItemRepository(session)
+    fields = repo.row_fields()
+    return dump_rows(fields, await repo.get_all(limit=size, fields=fields))
+
+
+async def measure(page, session: AsyncSession, size: int, repeat: int):
+    """
+    (CPU microseconds per row, peak traced bytes per row) for one page.
+    """
+    await page(session, size)  # warm the statement caches
+
+    start = time.process_time()
+    for _ in range(repeat):
+        await page(session, size)
+    cpu = (time.process_time() - start) / repeat
+
+    gc.collect()
+    tracemalloc.start()
+    await page(session, size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu / size * 1e6, peak / size
+
+
+async def run(repeat: int) -> None:
+    # statement logging and slow-query EXPLAINs would skew the numbers
+    engine.sync_engine.echo = False
+    settings.SLOW_QUERY_MS = 0
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await seed(conn, max(SIZES))
+            session = AsyncSession(bind=conn)
+            print(f"{'rows':>6}  {'path':<4}  {'cpu us/row':>10}  {'peak B/row':>10}")
+            for size in SIZES:
+                orm_cpu, orm_mem = await measure(orm_page, session, size, repeat)
+                raw_cpu, raw_mem = await measure(raw_page, session, size, repeat)
+                print(f"{size:>6}  {'orm':<4}  {orm_cpu:>10.2f}  {orm_mem:>10.0f}")
+                print(
+                    f"{size:>6}  {'raw':<4}  {raw_cpu:>10.2f}  {raw_mem:>10.0f}"
+                    f"  ({orm_cpu / raw_cpu:.1f}x cpu, {orm_mem / raw_mem:.1f}x memory)"
+                )
+        finally:
+            await transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per page size")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
@@ -0,0 +1,102 @@
+# benchmarks/response_classes.py
+"""
+List endpoint throughput with FastAPI's response_model serialization vs
+the responses in src/api/responses.py, for 50, 1,000 and 10,000 items.
+
+    python -m benchmarks.response_classes [--seconds 2]
+
+response_model: return ORM objects; FastAPI validates them into ItemOut,
+                dumps them to dicts and encodes those with json.dumps
+ModelResponse:  validate and dump_json in one pass (write endpoints)
+dump_rows:      Row tuples straight to JSON (GET /items/ since raw rows)
+
+No database is needed: every request serves the same prebuilt page, so
+the numbers are the serialization and framework cost per request.
+"""
+import argparse
+import asyncio
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI, Response
+
+from src.api.responses import ModelResponse
+from src.models.item import Item
+from src.schemas.fields import dump_rows
+from src.schemas.item import ItemOut
+
+SIZES = (50, 1000, 10000)
+
+
+def make_app(size: int) -> FastAPI:
+    now = datetime.now()
+    columns = tuple(ItemOut.model_fields)
+    values = [
+        {
+            "id": i,
+            "name": f"item {i}",
+            "description": "benchmark row",
+            "price": 9.99 + i,
+            "quantity": i % 100,
+            "student_id": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(size)
+    ]
+    items = [Item(**row) for row in values]
+    ItemRow = namedtuple("ItemRow", columns)
+    rows = [ItemRow(**row) for row in values]
+
+    app = FastAPI()
+
+    @app.get("/response_model", response_model=list[ItemOut])
+    async def with_response_model():
+        return items
+
+    @app.get("/model_response", response_model=list[ItemOut])
+    async def with_model_response():
+        return ModelResponse(items, list[ItemOut])
+
+    @app.get("/dump_rows", response_model=list[ItemOut])
+    async def with_dump_rows():
+        return Response(dump_rows(columns, rows), media_type="application/json")
+
+    return app
+
+
+async def throughput(client: httpx.AsyncClient, path: str, seconds: float) -> float:
+    """
+    Sequential requests per second for `seconds`.
+    """
+    await client.get(path)  # warm up
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        response = await client.get(path)
+        response.raise_for_status()
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+async def run(seconds: float) -> None:
+    print(f"{'items':>6}  {'path':<15}  {'req/s':>8}  {'items/s':>10}  {'speedup':>7}")
+    for size in SIZES:
+        transport = httpx.ASGITransport(app=make_app(size))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            baseline = None
+            for path in ("/response_model", "/model_response", "/dump_rows"):
+                rate = await throughput(client, path, seconds)
+                baseline = baseline or rate
+                print(
+                    f"{size:>6}  {path[1:]:<15}  {rate:>8.1f}  {rate * size:>10.0f}"
+                    f"  {rate / baseline:>6.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time per path and size")
+    args = parser.parse_args()
+    asyncio.run(run(args.seconds))
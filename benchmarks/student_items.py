@@ -0,0 +1,115 @@
+# benchmarks/student_items.py
+"""
+"Items of student X" lookups and cascade deletes, with and without the
+(student_id, id) index, on a large items table (10M rows by default).
+
+    python -m benchmarks.student_items [--items 10000000] [--students 100000]
+
+lookup first:  first page (50 items) of one student
+lookup deep:   a page further in, from a cursor
+cascade:       DELETE one student, its items go with ON DELETE CASCADE
+
+Runs against DATABASE_URL. The rows are generated by Postgres
+(generate_series) in a transaction that is rolled back at the end, and the
+index is dropped inside that transaction, so the database is left as it
+was. Seeding 10M rows takes a few minutes.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import engine
+from src.crud.baseitem import ItemRepository
+from src.models.student import Student
+
+SEED_STUDENTS = text("""
+    INSERT INTO students (name, age, grade)
+    SELECT 'student ' || n, 18 + n % 10, 'A' FROM generate_series(1, :count) AS n
+    RETURNING id
+""")
+
+# items spread evenly over the new students, interleaved by id like real traffic
+SEED_ITEMS = text("""
+    INSERT INTO items (name, description, price, quantity, student_id)
+    SELECT 'item ' || n, 'benchmark row', 1 + n % 500, n % 100, :first + n % :count
+    FROM generate_series(0, :items - 1) AS n
+""")
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1e3
+
+
+async def measure(conn, session: AsyncSession, student_ids, samples: int) -> dict:
+    repo = ItemRepository(session)
+    fields = repo.row_fields()
+    first, deep, cascade = [], [], []
+
+    for student_id in random.sample(student_ids, samples):
+        first.append(await timed(
+            repo.get_page_for_student(student_id, limit=50, fields=fields)
+        ))
+        _, cursor = await repo.get_page_for_student(student_id, limit=25, fields=fields)
+        if cursor:
+            deep.append(await timed(
+                repo.get_page_for_student(student_id, limit=50, cursor=cursor, fields=fields)
+            ))
+
+        savepoint = await conn.begin_nested()
+        cascade.append(await timed(
+            conn.execute(delete(Student).where(Student.id == student_id))
+        ))
+        await savepoint.rollback()
+
+    return {
+        name: statistics.median(values) if values else float("nan")
+        for name, values in (("lookup first", first), ("lookup deep", deep), ("cascade", cascade))
+    }
+
+
+async def run(items: int, students: int, samples: int) -> None:
+    # statement logging and slow-query EXPLAINs would skew the numbers
+    engine.sync_engine.echo = False
+    settings.SLOW_QUERY_MS = 0
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            start = time.perf_counter()
+            student_ids = list((await conn.execute(SEED_STUDENTS, {"count": students})).scalars())
+            await conn.execute(
+                SEED_ITEMS, {"first": student_ids[0], "count": students, "items": items}
+            )
+            await conn.execute(text("ANALYZE items"))
+            await conn.execute(text("ANALYZE students"))
+            print(f"seeded {items:,} items for {students:,} students "
+                  f"in {time.perf_counter() - start:.0f}s")
+
+            session = AsyncSession(bind=conn)
+            with_index = await measure(conn, session, student_ids, samples)
+            await conn.execute(text("DROP INDEX IF EXISTS ix_items_student_id_id"))
+            without_index = await measure(conn, session, student_ids, samples)
+
+            print(f"\nmedian of {samples} students, ms")
+            print(f"{'':<14}  {'with index':>10}  {'without':>10}")
+            for name in with_index:
+                print(f"{name:<14}  {with_index[name]:>10.2f}  {without_index[name]:>10.2f}")
+        finally:
+            await transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=10_000_000)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=20, help="students measured per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.students, args.samples))
@@ -0,0 +1,39 @@
+from typing import Any, List, Type, TypeVar
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from src.core.config import settings
+
+S = TypeVar("S", bound=BaseModel)
+
+
+def validate_rows(schema: Type[S], rows: List[Any]) -> List[S]:
+    """
+    Validate every row of a bulk payload against `schema`.
+    Errors are collected per row (by index) and returned together as one 422,
+    so a client can fix all bad rows in a single pass.
+    """
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ROWS} rows per request"
+        )
+
+    validated: List[S] = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            validated.append(schema.model_validate(row))
+        except ValidationError as exc:
+            errors.append({
+                "index": index,
+                "errors": exc.errors(include_url=False, include_context=False),
+            })
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=errors
+        )
+    return validated
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from src.core.replicas import CONSISTENCY_HEADER, parse_lsn
+
+
+def consistency_token(
+    token: Optional[str] = Header(
+        None,
+        alias=CONSISTENCY_HEADER,
+        description="Token from a previous write; the read will see that write",
+    ),
+) -> Optional[str]:
+    """
+    Dependency - the validated X-Consistency-Token header, or None.
+    """
+    if not token:
+        return None
+    try:
+        parse_lsn(token)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    return token
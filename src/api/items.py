@@ -1,57 +1,362 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from typing import Any, Literal, Optional, Tuple, Union
 
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+
+from src.api.bulk import validate_rows
+from src.api.consistency import consistency_token
+from src.api.negotiation import NegotiatedRoute, negotiate
+from src.api.params import Id, IdPath
+from src.api.responses import ModelResponse, FastJSONResponse
 from src.core.database import async_session_factory
-from src.schemas.item import ItemCreate, ItemUpdate, ItemOut
+from src.core.replicas import consistent_read_session, stamp_consistency_token
+from src.core.singleflight import SingleFlight
+from src.schemas.item import ItemCreate, ItemUpdate, ItemOut, ItemUpsert, ItemBulkUpdate
+from src.schemas.pagination import Page
+from src.schemas.nested import ItemWithStudent
+from src.schemas.fields import (
+    parse_fields, list_data, row_data, encode_rows, pack_rows, wrap_page
+)
+from src.schemas.bulk import BulkDelete, BulkDeleteResult
 from src.crud.baseitem import ItemRepository
 
 
-router = APIRouter(prefix="/items", tags=["items"])
+router = APIRouter(
+    prefix="/items",
+    tags=["items"],
+    default_response_class=FastJSONResponse,
+    route_class=NegotiatedRoute,
+)
+
+list_flight = SingleFlight("items.list")
 
 
 # 1. CREATE (POST)
 @router.post("/", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
-async def create_item(item: ItemCreate):
+async def create_item(item: ItemCreate, response: Response):
     """
     Create a new item
     """
     async with async_session_factory() as session:
         repo = ItemRepository(session)
-        created = await repo.create(item)
-        return created
+        try:
+            created = await repo.create(item)
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(
+            created, ItemOut, status_code=status.HTTP_201_CREATED, headers=response.headers
+        )
 
 
-# 2. READ ONE (GET by id)
-@router.get("/{item_id}", response_model=ItemOut)
-async def get_item(item_id: int):
+# 1b. BULK CREATE (POST many)
+@router.post("/bulk", response_model=list[ItemOut], status_code=status.HTTP_201_CREATED)
+async def create_items_bulk(response: Response, rows: list[dict[str, Any]] = Body(...)):
     """
-    Get one item by ID
+    Create many items in one transaction.
+    Rows are validated one by one; if any fail, nothing is written and the
+    response lists the errors for each failing row index.
+    Created items are returned in the same order as the request.
     """
+    items_in = validate_rows(ItemCreate, rows)
     async with async_session_factory() as session:
         repo = ItemRepository(session)
-        item = await repo.get_by_id(item_id)
-        if item is None:
+        try:
+            created = await repo.create_many(items_in)
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(
+            created, list[ItemOut], status_code=status.HTTP_201_CREATED, headers=response.headers
+        )
+
+
+# 2a. EXPORT (GET streamed list)
+@router.get("/stream")
+async def stream_items(
+    request: Request,
+    format: Literal["ndjson", "json"] = "ndjson",
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name,price"),
+    sort: str = Query("id", description="Indexed columns, '-' for descending, e.g. -id"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    Stream every matching item (same filters as the list endpoint) as
+    NDJSON (default) or one JSON array, read through a server-side cursor
+    `chunk_size` rows at a time. With `Accept: application/msgpack` (or
+    application/cbor) the rows are sent as a sequence of binary objects. Memory stays flat whatever the result size;
+    the query is cancelled when the client disconnects.
+    """
+    repo = ItemRepository(None)
+    try:
+        where = repo.build_filters(request.query_params.multi_items())
+        repo.check_sort(sort)
+        field_names = parse_fields(ItemOut, fields) if fields is not None else repo.row_fields()
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    codec = negotiate(request.headers.get("accept"))
+    ndjson = format == "ndjson" or codec is not None
+
+    async def body():
+        if not ndjson:
+            yield b"["
+        first = True
+        async with await consistent_read_session(token) as session:
+            repo = ItemRepository(session)
+            async for chunk in repo.stream(
+                order_by=sort, fields=field_names, where=where, chunk_size=chunk_size
+            ):
+                if await request.is_disconnected():
+                    break
+                if codec is not None:
+                    yield pack_rows(field_names, chunk, codec.dumps)
+                    continue
+                encoded = encode_rows(field_names, chunk, ndjson)
+                if not ndjson and not first:
+                    encoded = b"," + encoded
+                first = False
+                yield encoded
+        if not ndjson:
+            yield b"]"
+
+    if codec is not None:
+        media_type = codec.stream_media_type
+    else:
+        media_type = "application/x-ndjson" if ndjson else "application/json"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+# 2. READ ONE (GET by id)
+@router.get("/{item_id}", response_model=Union[ItemOut, ItemWithStudent])
+async def get_item(
+    item_id: IdPath,
+    include: Optional[Literal["student"]] = Query(None, description="Also return the item's student"),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    Get one item by ID (served from the entity cache when possible).
+    With an X-Consistency-Token from a previous write, the read is guaranteed
+    to see that write.
+    `include=student` loads the student in the same request (not cached).
+    """
+    async with await consistent_read_session(token) as session:
+        repo = ItemRepository(session)
+        if include is not None:
+            item = await repo.get_by_id(item_id, include=[include])
+            if item is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Item not found"
+                )
+            return ModelResponse(item, ItemWithStudent)
+        payload = await repo.get_payload(item_id, fresh=token is not None)
+        if payload is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Item not found"
             )
-        return item
+        return Response(content=payload, media_type="application/json")
 
 
 # 3. READ ALL (GET list)
-@router.get("/", response_model=list[ItemOut])
-async def get_all_items(skip: int = 0, limit: int = 50):
+@router.get(
+    "/",
+    response_model=Union[list[ItemOut], Page[ItemOut], list[ItemWithStudent], Page[ItemWithStudent]],
+)
+async def get_all_items(
+    request: Request,
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    paginate: Literal["offset", "cursor"] = "offset",
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name,price"),
+    sort: str = Query("id", description="Indexed columns, '-' for descending, e.g. -id"),
+    count: Literal["none", "estimate", "exact"] = "estimate",
+    render: Literal["python", "postgres"] = "python",
+    include: Optional[Literal["student"]] = Query(None, description="Also return the item's student"),
+    token: Optional[str] = Depends(consistency_token),
+):
     """
-    Get list of items with pagination
+    Get list of items with pagination.
+
+    Offset mode (default) returns a bare list and is kept for old clients.
+    Cursor mode (`paginate=cursor`, or any `cursor=`) returns
+    `{"items": [...], "next_cursor": ...}`; pass `next_cursor` back as
+    `cursor` to get the next page. Deep pages cost the same as the first one.
+
+    `fields` selects only those columns (plus `id`) in SQL and returns
+    trimmed objects.
+
+    Filters: `price[gte]=10&student_id=5&name[like]=pen`
+    (bare `column=value` means eq; operators: eq, ne, gt, gte, lt, lte, in, like).
+    Sorting: `sort=-created_at,id`; only indexed columns are accepted.
+
+    The total goes in `X-Total-Count` (and `total` in the cursor envelope).
+    By default it is the planner's estimate (`X-Total-Count-Estimated: true`);
+    `count=exact` runs a real COUNT(*), cached briefly per filter.
+
+    `render=postgres` has Postgres build the JSON (json_agg) and sends its
+    text as is - same shape, no Python serialization; for big pages.
+
+    `include=student` adds each item's student, loaded for the whole page in
+    one extra query (not with `fields` or `render=postgres`).
+
+    Identical requests arriving while one is running share its result.
     """
+    key = (token, tuple(sorted(request.query_params.multi_items())))
+    body, headers = await list_flight.do(
+        key,
+        lambda: _list_items(
+            request.query_params.multi_items(),
+            skip, limit, cursor, paginate, fields, sort, count, render, include, token,
+        ),
+    )
+    if isinstance(body, bytes):
+        return Response(content=body, media_type="application/json", headers=headers)
+    return FastJSONResponse(body, headers=headers)
+
+
+async def _list_items(
+    params, skip, limit, cursor, paginate, fields, sort, count, render, include, token
+) -> Tuple[Any, dict]:
+    async with await consistent_read_session(token) as session:
+        repo = ItemRepository(session)
+        paged = paginate == "cursor" or cursor is not None
+        next_cursor = None
+        try:
+            where = repo.build_filters(params)
+            repo.check_sort(sort)
+            includes = [include] if include is not None else []
+            if includes and (fields is not None or render == "postgres"):
+                raise ValueError("include can't be combined with fields or render=postgres")
+            if includes:
+                # nested objects need entities with the relationship loaded
+                field_names = None
+            else:
+                # full rows come back as plain Row tuples too, never ORM instances
+                field_names = parse_fields(ItemOut, fields) if fields is not None else repo.row_fields()
+            if render == "postgres" and paged:
+                items, returned, next_cursor = await repo.get_page_json(
+                    limit=limit, cursor=cursor, order_by=sort, fields=field_names, where=where
+                )
+            elif render == "postgres":
+                items, returned = await repo.get_all_json(
+                    skip=skip, limit=limit, order_by=sort, fields=field_names, where=where
+                )
+            elif paged:
+                items, next_cursor = await repo.get_page(
+                    limit=limit, cursor=cursor, order_by=sort, fields=field_names, where=where,
+                    include=includes,
+                )
+                returned = len(items)
+            else:
+                items = await repo.get_all(
+                    skip=skip, limit=limit, order_by=sort, fields=field_names, where=where,
+                    include=includes,
+                )
+                returned = len(items)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+
+        total, exact = None, False
+        if not paged and 0 < returned < limit:
+            # a short offset page already tells us the exact total
+            total, exact = skip + returned, True
+        elif count != "none":
+            total, exact = await repo.count(where, exact=count == "exact")
+
+    page = None
+    if paged:
+        page = {
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": None if total is None else not exact,
+        }
+    if render == "postgres":
+        body = items if page is None else wrap_page(items, page)
+    elif includes:
+        body = list_data(ItemWithStudent, items, page)
+    else:
+        body = row_data(field_names, items, page)
+
+    headers = {}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+        if not exact:
+            headers["X-Total-Count-Estimated"] = "true"
+    return body, headers
+
+
+# 3b. UPSERT (POST many - insert or overwrite by id)
+@router.post("/upsert", response_model=list[ItemOut])
+async def upsert_items(response: Response, rows: list[dict[str, Any]] = Body(...)):
+    """
+    Insert or overwrite many items with one INSERT ... ON CONFLICT (id) DO UPDATE.
+    Rows without an `id` are inserted. Results come back in request order.
+    """
+    items_in = validate_rows(ItemUpsert, rows)
     async with async_session_factory() as session:
         repo = ItemRepository(session)
-        items = await repo.get_all(skip=skip, limit=limit)
-        return items
+        try:
+            result = await repo.upsert_many(items_in)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(result, list[ItemOut], headers=response.headers)
+
+
+# 3c. BULK UPDATE (PUT many - partial update)
+@router.put("/bulk", response_model=list[ItemOut])
+async def update_items_bulk(response: Response, rows: list[dict[str, Any]] = Body(...)):
+    """
+    Partial update of many items with one UPDATE ... FROM (VALUES ...).
+    Every row needs an `id`; only the fields sent are changed.
+    Returns the updated items; ids that don't exist are left out.
+    """
+    updates = validate_rows(ItemBulkUpdate, rows)
+    async with async_session_factory() as session:
+        repo = ItemRepository(session)
+        try:
+            result = await repo.update_many(updates)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(result, list[ItemOut], headers=response.headers)
 
 
 # 4. UPDATE (PUT - partial update)
 @router.put("/{item_id}", response_model=ItemOut)
-async def update_item(item_id: int, item_data: ItemUpdate):
+async def update_item(item_id: IdPath, item_data: ItemUpdate, response: Response):
     """
     Update existing item (partial update - only sent fields are updated)
     """
@@ -65,18 +370,25 @@ async def update_item(item_id: int, item_data: ItemUpdate):
                 detail="At least one field must be provided for update"
             )
 
-        updated = await repo.update(item_id, item_data)
+        try:
+            updated = await repo.update(item_id, item_data)
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
         if updated is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Item not found"
             )
-        return updated
+        await stamp_consistency_token(session, response)
+        return ModelResponse(updated, ItemOut, headers=response.headers)
 
 
 # 5. DELETE
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_item(item_id: int):
+async def delete_item(item_id: IdPath, response: Response):
     """
     Delete an item by ID
     """
@@ -88,3 +400,40 @@ async def delete_item(item_id: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Item not found"
             )
+        await stamp_consistency_token(session, response)
+
+
+# 5b. BULK DELETE (DELETE many by id)
+@router.delete("/", response_model=BulkDeleteResult)
+async def delete_items_bulk(response: Response, ids: list[Id] = Query(..., min_length=1)):
+    """
+    Delete many items by id in one statement: DELETE /items/?ids=1&ids=2
+    """
+    async with async_session_factory() as session:
+        repo = ItemRepository(session)
+        deleted = await repo.delete_many(ids)
+        await stamp_consistency_token(session, response)
+        return {"deleted": len(deleted), "ids": deleted}
+
+
+# 5c. BULK DELETE (JSON body - by ids or by filter)
+@router.post("/delete", response_model=BulkDeleteResult)
+async def delete_items_batch(request: BulkDelete, response: Response):
+    """
+    Delete items by `ids`, or by a `where` column filter.
+    Filter deletes run in chunks (one transaction each) to keep locks short.
+    """
+    async with async_session_factory() as session:
+        repo = ItemRepository(session)
+        if request.ids is not None:
+            deleted = await repo.delete_many(request.ids)
+        else:
+            try:
+                deleted = await repo.delete_where(request.where, chunk_size=request.chunk_size)
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc)
+                )
+        await stamp_consistency_token(session, response)
+        return {"deleted": len(deleted), "ids": deleted}
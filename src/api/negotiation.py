@@ -0,0 +1,178 @@
+# src/api/negotiation.py
+"""
+MessagePack and CBOR next to JSON, picked by Content-Type / Accept.
+
+    Content-Type: application/msgpack   request body in MessagePack
+    Accept: application/cbor            response body in CBOR
+
+Bodies are decoded before FastAPI sees them, so the usual schemas
+(ItemCreate, ...) validate them exactly as they validate JSON. Responses
+are built by the routes as usual and re-encoded here from the data they
+were rendered from (see responses.py), with the same shape: timestamps
+stay ISO strings. Bodies that only exist as JSON text - entity-cache
+payloads and lists rendered by Postgres - are decoded first. JSON remains the default; error responses are
+always JSON. msgpack and cbor2 are optional - a format whose library is
+not installed is simply not offered.
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.responses import StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for application/msgpack
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional: only needed for application/cbor
+    cbor2 = None
+
+JSON = "application/json"
+BINARY = ("application/msgpack", "application/x-msgpack", "application/cbor")
+
+
+@dataclass(frozen=True)
+class Codec:
+    media_type: str
+    # media type of a streamed sequence of objects
+    stream_media_type: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+    errors: Tuple[type, ...]
+
+
+codecs: Dict[str, Codec] = {}
+if msgpack is not None:
+    codecs["application/msgpack"] = codecs["application/x-msgpack"] = Codec(
+        media_type="application/msgpack",
+        stream_media_type="application/msgpack",
+        dumps=msgpack.packb,
+        loads=msgpack.unpackb,
+        errors=(ValueError, msgpack.UnpackException),
+    )
+if cbor2 is not None:
+    codecs["application/cbor"] = Codec(
+        media_type="application/cbor",
+        stream_media_type="application/cbor-seq",
+        dumps=cbor2.dumps,
+        loads=cbor2.loads,
+        errors=(ValueError, cbor2.CBORDecodeError),
+    )
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+def negotiate(accept: Optional[str]) -> Optional[Codec]:
+    """
+    The codec to answer with for an Accept header, None for JSON.
+    Raises 406 if the client accepts none of the formats we can produce.
+    """
+    if not accept:
+        return None
+    ranges = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, position, media_type.strip().lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in (JSON, "application/*", "*/*"):
+            return None
+        if media_type in codecs:
+            return codecs[media_type]
+    supported = [JSON, *sorted({codec.media_type for codec in codecs.values()})]
+    raise HTTPException(
+        status_code=status.HTTP_406_NOT_ACCEPTABLE,
+        detail=f"Supported formats: {', '.join(supported)}"
+    )
+
+
+class DecodedRequest(Request):
+    """
+    A request with a binary body, presented to FastAPI as JSON: the
+    content type says application/json and json() decodes with the codec.
+    """
+
+    def __init__(self, request: Request, codec: Codec):
+        scope = dict(request.scope)
+        scope["headers"] = [
+            (name, value) for name, value in request.scope["headers"] if name != b"content-type"
+        ] + [(b"content-type", JSON.encode())]
+        super().__init__(scope, request.receive)
+        self.codec = codec
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            try:
+                self._json = self.codec.loads(await self.body())
+            except self.codec.errors:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Malformed {self.codec.media_type} body"
+                )
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route class for routers that speak MessagePack/CBOR as well as JSON.
+    Streaming responses are left alone: those routes call `negotiate` and
+    encode their rows themselves, as a sequence of objects. Routes that
+    answer without a body (204) never refuse an Accept header; a body they
+    send in another case (DELETE ?mode=async: 202) falls back to JSON.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type")
+            if content_type:
+                media_type = _media_type(content_type)
+                if media_type in codecs:
+                    request = DecodedRequest(request, codecs[media_type])
+                elif media_type in BINARY:
+                    raise HTTPException(
+                        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail=f"{media_type} is not supported by this server"
+                    )
+            try:
+                codec = negotiate(request.headers.get("accept"))
+            except HTTPException:
+                if is_body_allowed_for_status_code(self.status_code):
+                    raise
+                codec = None
+
+            response = await handler(request)
+            response.headers.append("Vary", "Accept")
+            if isinstance(response, StreamingResponse):
+                return response
+            if codec is None or not response.body:
+                return response
+            if _media_type(response.headers.get("content-type", "")) != JSON:
+                return response
+
+            jsonable = getattr(response, "jsonable", None)
+            data = jsonable() if jsonable is not None else json.loads(response.body)
+            response.body = codec.dumps(data)
+            response.headers["content-length"] = str(len(response.body))
+            response.headers["content-type"] = codec.media_type
+            return response
+
+        return negotiated_handler
@@ -0,0 +1,14 @@
+# src/api/params.py
+"""
+Parameter types shared by the routers.
+"""
+from typing import Annotated
+
+from fastapi import Path
+
+from src.schemas.ids import MAX_ID, Id
+
+# a row id in the URL path: /items/{item_id}
+IdPath = Annotated[int, Path(ge=1, le=MAX_ID)]
+
+__all__ = ["MAX_ID", "Id", "IdPath"]
@@ -0,0 +1,67 @@
+# src/api/responses.py
+"""
+JSON responses encoded by pydantic instead of the stdlib `json`.
+
+For a `response_model`, FastAPI validates the return value into the model,
+dumps it back to a dict of plain JSON types and hands that to json.dumps.
+ModelResponse does it in one pass: validate (from ORM attributes) and
+dump_json straight to bytes. The route keeps `response_model`, which then
+only documents the response.
+
+Both classes keep the content they were given: `jsonable()` returns it as
+plain JSON types, so negotiation.py can pack MessagePack/CBOR from it
+instead of parsing the JSON body back.
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+from starlette.responses import JSONResponse, Response
+
+
+@lru_cache(maxsize=64)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+class ModelResponse(Response):
+    """
+    `content` (ORM objects, dicts or models) as JSON of `model`, which can
+    be a schema or e.g. list[ItemOut]. Headers set on the route's injected
+    Response (like the consistency token) have to be passed in `headers`:
+    FastAPI does not copy them onto a Response the route returns itself.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        model: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        self.model = model
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        adapter = _adapter(self.model)
+        self.value = adapter.validate_python(content, from_attributes=True)
+        return adapter.dump_json(self.value)
+
+    def jsonable(self) -> Any:
+        return _adapter(self.model).dump_python(self.value, mode="json")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with pydantic_core.to_json: same compact UTF-8
+    output as Starlette's json.dumps call, several times faster.
+    """
+
+    def render(self, content: Any) -> bytes:
+        self.content = content
+        return to_json(content)
+
+    def jsonable(self) -> Any:
+        return to_jsonable_python(self.content)
@@ -1,53 +1,442 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Literal, Optional, Tuple, Union
 
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+
+from src.api.bulk import validate_rows
+from src.api.consistency import consistency_token
+from src.api.negotiation import NegotiatedRoute, negotiate
+from src.api.params import Id, IdPath
+from src.api.responses import ModelResponse, FastJSONResponse
+from src.core import cascade_delete
 from src.core.database import async_session_factory
-from src.schemas.student import StudentCreate, StudentUpdate, StudentOut
-from src.crud import StudentRepository   # ← we use this now
+from src.core.replicas import consistent_read_session, stamp_consistency_token
+from src.core.singleflight import SingleFlight
+from src.schemas.student import (
+    StudentCreate, StudentUpdate, StudentOut, StudentUpsert, StudentBulkUpdate,
+    StudentSummary, StudentWithStats,
+)
+from src.schemas.item import ItemOut
+from src.schemas.pagination import Page
+from src.schemas.nested import StudentWithItems
+from src.schemas.fields import (
+    parse_fields, list_data, row_data, encode_rows, pack_rows, wrap_page
+)
+from src.schemas.bulk import BulkDelete, BulkDeleteResult
+from src.schemas.deletion import StudentDeletionOut
+from src.crud import StudentRepository, ItemRepository
+
+router = APIRouter(
+    prefix="/students",
+    tags=["students"],
+    default_response_class=FastJSONResponse,
+    route_class=NegotiatedRoute,
+)
 
-router = APIRouter(prefix="/students", tags=["students"])
+list_flight = SingleFlight("students.list")
 
 
 # 1. CREATE (POST)
 @router.post("/", response_model=StudentOut, status_code=status.HTTP_201_CREATED)
-async def create_student(student: StudentCreate):
+async def create_student(student: StudentCreate, response: Response):
     """
     Create a new student
     """
     async with async_session_factory() as session:
         repo = StudentRepository(session)
         created = await repo.create(student)
-        return created
+        await stamp_consistency_token(session, response)
+        return ModelResponse(
+            created, StudentOut, status_code=status.HTTP_201_CREATED, headers=response.headers
+        )
 
 
-# 2. READ ONE (GET by id)
-@router.get("/{student_id}", response_model=StudentOut)
-async def get_student(student_id: int):
+# 1b. BULK CREATE (POST many)
+@router.post("/bulk", response_model=list[StudentOut], status_code=status.HTTP_201_CREATED)
+async def create_students_bulk(response: Response, rows: list[dict[str, Any]] = Body(...)):
     """
-    Get one student by ID
+    Create many students in one transaction.
+    Rows are validated one by one; if any fail, nothing is written and the
+    response lists the errors for each failing row index.
+    Created students are returned in the same order as the request.
     """
+    students_in = validate_rows(StudentCreate, rows)
     async with async_session_factory() as session:
         repo = StudentRepository(session)
-        student = await repo.get_by_id(student_id)
-        if student is None:
+        try:
+            created = await repo.create_many(students_in)
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(
+            created, list[StudentOut], status_code=status.HTTP_201_CREATED, headers=response.headers
+        )
+
+
+# 2a. EXPORT (GET streamed list)
+@router.get("/stream")
+async def stream_students(
+    request: Request,
+    format: Literal["ndjson", "json"] = "ndjson",
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name"),
+    sort: str = Query("id", description="Indexed columns, '-' for descending, e.g. -id"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    Stream every matching student (same filters as the list endpoint) as
+    NDJSON (default) or one JSON array, read through a server-side cursor
+    `chunk_size` rows at a time. With `Accept: application/msgpack` (or
+    application/cbor) the rows are sent as a sequence of binary objects. Memory stays flat whatever the result size;
+    the query is cancelled when the client disconnects.
+    """
+    repo = StudentRepository(None)
+    try:
+        where = repo.build_filters(request.query_params.multi_items())
+        repo.check_sort(sort)
+        field_names = parse_fields(StudentOut, fields) if fields is not None else repo.row_fields()
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    codec = negotiate(request.headers.get("accept"))
+    ndjson = format == "ndjson" or codec is not None
+
+    async def body():
+        if not ndjson:
+            yield b"["
+        first = True
+        async with await consistent_read_session(token) as session:
+            repo = StudentRepository(session)
+            async for chunk in repo.stream(
+                order_by=sort, fields=field_names, where=where, chunk_size=chunk_size
+            ):
+                if await request.is_disconnected():
+                    break
+                if codec is not None:
+                    yield pack_rows(field_names, chunk, codec.dumps)
+                    continue
+                encoded = encode_rows(field_names, chunk, ndjson)
+                if not ndjson and not first:
+                    encoded = b"," + encoded
+                first = False
+                yield encoded
+        if not ndjson:
+            yield b"]"
+
+    if codec is not None:
+        media_type = codec.stream_media_type
+    else:
+        media_type = "application/x-ndjson" if ndjson else "application/json"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+# 2b. SUMMARY (GET aggregates for many students)
+@router.get("/summary", response_model=list[StudentSummary])
+async def get_students_summary(
+    ids: list[Id] = Query(..., min_length=1, max_length=1000),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    Item count, total quantity and total value (price * quantity) for each
+    student: GET /students/summary?ids=1&ids=2. Read from the maintained
+    student_inventory_summary table, one primary-key lookup per student;
+    unknown ids are left out.
+    """
+    async with await consistent_read_session(token) as session:
+        repo = StudentRepository(session)
+        rows = await repo.summaries(ids)
+    return FastJSONResponse(row_data(tuple(StudentSummary.model_fields), rows))
+
+
+# 2c. SUMMARY (GET aggregates for one student)
+@router.get("/{student_id}/summary", response_model=StudentSummary)
+async def get_student_summary(student_id: IdPath, token: Optional[str] = Depends(consistency_token)):
+    """
+    Item count, total quantity and total value (price * quantity) of one student
+    """
+    async with await consistent_read_session(token) as session:
+        repo = StudentRepository(session)
+        rows = await repo.summaries([student_id])
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    return ModelResponse(rows[0]._asdict(), StudentSummary)
+
+
+# 2d. ITEMS OF ONE STUDENT (GET, cursor pages)
+@router.get("/{student_id}/items", response_model=Page[ItemOut])
+async def get_student_items(
+    student_id: IdPath,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "-id"] = "id",
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name,price"),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    The student's items, one keyset page at a time:
+    `{"items": [...], "next_cursor": ...}`; pass `next_cursor` back as
+    `cursor` for the next page. Every page is a short range scan of the
+    (student_id, id) index, however many items there are.
+    """
+    async with await consistent_read_session(token) as session:
+        repo = ItemRepository(session)
+        try:
+            field_names = parse_fields(ItemOut, fields) if fields is not None else repo.row_fields()
+            items, next_cursor = await repo.get_page_for_student(
+                student_id, limit=limit, cursor=cursor, order_by=sort, fields=field_names
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        # an empty first page is either a student without items or no student
+        if not items and cursor is None:
+            if await StudentRepository(session).get_by_id(student_id) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+
+    page = {"next_cursor": next_cursor, "total": None, "total_is_estimate": None}
+    return FastJSONResponse(row_data(field_names, items, page))
+
+
+# 2. READ ONE (GET by id)
+@router.get("/{student_id}", response_model=Union[StudentOut, StudentWithItems])
+async def get_student(
+    student_id: IdPath,
+    include: Optional[Literal["items"]] = Query(None, description="Also return the student's items"),
+    token: Optional[str] = Depends(consistency_token),
+):
+    """
+    Get one student by ID (served from the entity cache when possible).
+    With an X-Consistency-Token from a previous write, the read is guaranteed
+    to see that write.
+    `include=items` loads the items in the same request (not cached).
+    """
+    async with await consistent_read_session(token) as session:
+        repo = StudentRepository(session)
+        if include is not None:
+            student = await repo.get_by_id(student_id, include=[include])
+            if student is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Student not found"
+                )
+            return ModelResponse(student, StudentWithItems)
+        payload = await repo.get_payload(student_id, fresh=token is not None)
+        if payload is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-        return student
+        return Response(content=payload, media_type="application/json")
 
 
 # 3. READ ALL (GET list)
-@router.get("/", response_model=list[StudentOut])
-async def get_all_students(skip: int = 0, limit: int = 50):
+@router.get(
+    "/",
+    response_model=Union[
+        list[StudentOut], Page[StudentOut],
+        list[StudentWithItems], Page[StudentWithItems],
+        list[StudentWithStats], Page[StudentWithStats],
+    ],
+)
+async def get_all_students(
+    request: Request,
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    paginate: Literal["offset", "cursor"] = "offset",
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name"),
+    sort: str = Query("id", description="Indexed columns, '-' for descending, e.g. -id"),
+    count: Literal["none", "estimate", "exact"] = "estimate",
+    render: Literal["python", "postgres"] = "python",
+    include: Optional[Literal["items"]] = Query(None, description="Also return the student's items"),
+    with_: Optional[Literal["stats"]] = Query(
+        None, alias="with", description="Add item_count, total_quantity and total_value"
+    ),
+    token: Optional[str] = Depends(consistency_token),
+):
     """
-    Get list of students with pagination
+    Get list of students with pagination.
+
+    Offset mode (default) returns a bare list and is kept for old clients.
+    Cursor mode (`paginate=cursor`, or any `cursor=`) returns
+    `{"items": [...], "next_cursor": ...}`; pass `next_cursor` back as
+    `cursor` to get the next page. Deep pages cost the same as the first one.
+
+    `fields` selects only those columns (plus `id`) in SQL and returns
+    trimmed objects.
+
+    Filters: `age[gte]=18&grade[in]=A,B&name[like]=ann`
+    (bare `column=value` means eq; operators: eq, ne, gt, gte, lt, lte, in, like).
+    Sorting: `sort=-id`; only indexed columns are accepted.
+
+    The total goes in `X-Total-Count` (and `total` in the cursor envelope).
+    By default it is the planner's estimate (`X-Total-Count-Estimated: true`);
+    `count=exact` runs a real COUNT(*), cached briefly per filter.
+
+    `render=postgres` has Postgres build the JSON (json_agg) and sends its
+    text as is - same shape, no Python serialization; for big pages.
+
+    `include=items` adds each student's items, loaded for the whole page in
+    one extra query (not with `fields` or `render=postgres`).
+
+    `with=stats` adds each student's item_count, total_quantity and
+    total_value, aggregated per row in the same query (LATERAL join).
+
+    Identical requests arriving while one is running share its result.
     """
+    key = (token, tuple(sorted(request.query_params.multi_items())))
+    body, headers = await list_flight.do(
+        key,
+        lambda: _list_students(
+            request.query_params.multi_items(),
+            skip, limit, cursor, paginate, fields, sort, count, render, include, with_,
+            token,
+        ),
+    )
+    if isinstance(body, bytes):
+        return Response(content=body, media_type="application/json", headers=headers)
+    return FastJSONResponse(body, headers=headers)
+
+
+async def _list_students(
+    params, skip, limit, cursor, paginate, fields, sort, count, render, include, with_,
+    token,
+) -> Tuple[Any, dict]:
+    async with await consistent_read_session(token) as session:
+        repo = StudentRepository(session)
+        paged = paginate == "cursor" or cursor is not None
+        next_cursor = None
+        try:
+            where = repo.build_filters(params)
+            repo.check_sort(sort)
+            includes = [include] if include is not None else []
+            computed = [with_] if with_ is not None else []
+            if includes and (fields is not None or render == "postgres"):
+                raise ValueError("include can't be combined with fields or render=postgres")
+            if computed and (includes or render == "postgres"):
+                raise ValueError("with can't be combined with include or render=postgres")
+            if includes:
+                # nested objects need entities with the relationship loaded
+                field_names = None
+            else:
+                # full rows come back as plain Row tuples too, never ORM instances
+                field_names = parse_fields(StudentOut, fields) if fields is not None else repo.row_fields()
+            if render == "postgres" and paged:
+                students, returned, next_cursor = await repo.get_page_json(
+                    limit=limit, cursor=cursor, order_by=sort, fields=field_names, where=where
+                )
+            elif render == "postgres":
+                students, returned = await repo.get_all_json(
+                    skip=skip, limit=limit, order_by=sort, fields=field_names, where=where
+                )
+            elif paged:
+                students, next_cursor = await repo.get_page(
+                    limit=limit, cursor=cursor, order_by=sort, fields=field_names, where=where,
+                    include=includes, computed=computed,
+                )
+                returned = len(students)
+            else:
+                students = await repo.get_all(
+                    skip=skip, limit=limit, order_by=sort, fields=field_names, where=where,
+                    include=includes, computed=computed,
+                )
+                returned = len(students)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+
+        total, exact = None, False
+        if not paged and 0 < returned < limit:
+            # a short offset page already tells us the exact total
+            total, exact = skip + returned, True
+        elif count != "none":
+            total, exact = await repo.count(where, exact=count == "exact")
+
+    page = None
+    if paged:
+        page = {
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": None if total is None else not exact,
+        }
+    if render == "postgres":
+        body = students if page is None else wrap_page(students, page)
+    elif includes:
+        body = list_data(StudentWithItems, students, page)
+    else:
+        body = row_data((*field_names, *repo.computed_fields(computed)), students, page)
+
+    headers = {}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+        if not exact:
+            headers["X-Total-Count-Estimated"] = "true"
+    return body, headers
+
+
+# 3b. UPSERT (POST many - insert or overwrite by id)
+@router.post("/upsert", response_model=list[StudentOut])
+async def upsert_students(response: Response, rows: list[dict[str, Any]] = Body(...)):
+    """
+    Insert or overwrite many students with one INSERT ... ON CONFLICT (id) DO UPDATE.
+    Rows without an `id` are inserted. Results come back in request order.
+    """
+    students_in = validate_rows(StudentUpsert, rows)
+    async with async_session_factory() as session:
+        repo = StudentRepository(session)
+        try:
+            result = await repo.upsert_many(students_in)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(result, list[StudentOut], headers=response.headers)
+
+
+# 3c. BULK UPDATE (PUT many - partial update)
+@router.put("/bulk", response_model=list[StudentOut])
+async def update_students_bulk(response: Response, rows: list[dict[str, Any]] = Body(...)):
+    """
+    Partial update of many students with one UPDATE ... FROM (VALUES ...).
+    Every row needs an `id`; only the fields sent are changed.
+    Returns the updated students; ids that don't exist are left out.
+    """
+    updates = validate_rows(StudentBulkUpdate, rows)
     async with async_session_factory() as session:
         repo = StudentRepository(session)
-        students = await repo.get_all(skip=skip, limit=limit)
-        return students
+        try:
+            result = await repo.update_many(updates)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return ModelResponse(result, list[StudentOut], headers=response.headers)
 
 
 # 4. UPDATE (PUT - partial update)
 @router.put("/{student_id}", response_model=StudentOut)
-async def update_student(student_id: int, student_data: StudentUpdate):
+async def update_student(student_id: IdPath, student_data: StudentUpdate, response: Response):
     """
     Update existing student (partial update - only sent fields are updated)
     """
@@ -61,27 +450,132 @@ async def update_student(student_id: int, student_data: StudentUpdate):
                 detail="At least one field must be provided for update"
             )
 
-        updated = await repo.update(student_id, student_data)
+        try:
+            updated = await repo.update(student_id, student_data)
+        except IntegrityError as exc:
+            # its background deletion is running
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
         if updated is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found"
             )
-        return updated
+        await stamp_consistency_token(session, response)
+        return ModelResponse(updated, StudentOut, headers=response.headers)
 
 
 # 5. DELETE
-@router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_student(student_id: int):
+@router.delete(
+    "/{student_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": StudentDeletionOut}},
+)
+async def delete_student(
+    student_id: IdPath,
+    response: Response,
+    mode: Literal["sync", "async"] = "sync",
+):
     """
-    Delete a student by ID
+    Delete a student by ID, its items go with it. 409 while a background
+    deletion of it is running.
+    ?mode=async is for students with very many items: answers 202 with a
+    job (see GET /students/deletions/{job_id}) and deletes the items in
+    small batches in the background, then the student.
     """
+    if mode == "async":
+        job = await cascade_delete.start(student_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
+            )
+        return ModelResponse(
+            job,
+            StudentDeletionOut,
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": router.url_path_for("get_student_deletion", job_id=job.id)},
+        )
+
     async with async_session_factory() as session:
         repo = StudentRepository(session)
-        deleted = await repo.delete(student_id)
+        try:
+            deleted = await repo.delete(student_id)
+        except IntegrityError as exc:
+            # its background deletion is running; don't cascade twice
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
         if deleted is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found"
             )
-    # No need to return anything → FastAPI will send 204 No Content
\ No newline at end of file
+        await stamp_consistency_token(session, response)
+    # No need to return anything → FastAPI will send 204 No Content
+
+
+# 5b. BULK DELETE (DELETE many by id)
+@router.delete("/", response_model=BulkDeleteResult)
+async def delete_students_bulk(response: Response, ids: list[Id] = Query(..., min_length=1)):
+    """
+    Delete many students by id in one statement: DELETE /students/?ids=1&ids=2
+    """
+    async with async_session_factory() as session:
+        repo = StudentRepository(session)
+        try:
+            deleted = await repo.delete_many(ids)
+        except IntegrityError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return {"deleted": len(deleted), "ids": deleted}
+
+
+# 5c. BULK DELETE (JSON body - by ids or by filter)
+@router.post("/delete", response_model=BulkDeleteResult)
+async def delete_students_batch(request: BulkDelete, response: Response):
+    """
+    Delete students by `ids`, or by a `where` column filter.
+    Filter deletes run in chunks (one transaction each) to keep locks short.
+    """
+    async with async_session_factory() as session:
+        repo = StudentRepository(session)
+        try:
+            if request.ids is not None:
+                deleted = await repo.delete_many(request.ids)
+            else:
+                deleted = await repo.delete_where(request.where, chunk_size=request.chunk_size)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+        except IntegrityError as exc:
+            # a student whose background deletion is running
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(exc.orig)
+            )
+        await stamp_consistency_token(session, response)
+        return {"deleted": len(deleted), "ids": deleted}
+
+
+# 5d. BACKGROUND DELETE STATUS
+@router.get("/deletions/{job_id}", response_model=StudentDeletionOut)
+async def get_student_deletion(job_id: IdPath):
+    """
+    Status and progress of a DELETE /students/{id}?mode=async job
+    """
+    job = await cascade_delete.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deletion job not found"
+        )
+    return ModelResponse(job, StudentDeletionOut)
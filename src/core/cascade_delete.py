@@ -0,0 +1,196 @@
+# src/core/cascade_delete.py
+"""
+Background deletion of students with many items.
+
+DELETE /students/{id} removes the student and, through ON DELETE CASCADE,
+all its items in one statement: one transaction holding every row lock and
+writing all the WAL at once. With ?mode=async the request only records a
+StudentDeletion job (which marks the student as being deleted) and answers
+202; the job then deletes the items in batches of CASCADE_DELETE_BATCH_SIZE,
+one short transaction each, and finally the student row.
+
+While the job runs, the student reads as missing (404), can't be updated
+or deleted another way (409), and items can't be created for it or moved
+to it (DELETION_GUARD in create_tables.py), so the batches aren't chasing
+new rows.
+
+Jobs run as tasks in the worker that accepted them. Every batch records
+progress in the job row, so a job whose worker died stops making progress;
+after CASCADE_DELETE_STALE_SECONDS it is taken over by the next request to
+delete that student, or by `resume_orphaned` at startup.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional, Set
+
+from sqlalchemy import delete, func, select, update
+
+from src.core.config import settings
+from src.core.database import async_session_factory
+from src.crud import ItemRepository, StudentRepository
+from src.models.deletion import StudentDeletion
+from src.models.inventory import StudentInventorySummary
+from src.models.item import Item
+from src.models.student import Student
+
+logger = logging.getLogger(__name__)
+
+RUNNING, DONE, FAILED = "running", "done", "failed"
+
+# jobs running in this process; the event loop only keeps weak references
+_tasks: Set[asyncio.Task] = set()
+
+
+def _now():
+    return func.timezone("utc", func.now())
+
+
+def _orphaned():
+    # running, but no progress for longer than a batch can take
+    return (StudentDeletion.status == RUNNING) & (
+        StudentDeletion.updated_at
+        < _now() - timedelta(seconds=settings.CASCADE_DELETE_STALE_SECONDS)
+    )
+
+
+def _spawn(job_id: int) -> None:
+    task = asyncio.get_running_loop().create_task(run(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def start(student_id: int) -> Optional[StudentDeletion]:
+    """
+    Start deleting a student in the background and return its job, or the
+    job already running for it. None if the student doesn't exist.
+    """
+    async with async_session_factory() as session:
+        # serializes concurrent requests for the same student
+        found = await session.scalar(
+            select(Student.id).where(Student.id == student_id).with_for_update()
+        )
+        if found is None:
+            return None
+
+        job = await session.scalar(
+            select(StudentDeletion).where(
+                StudentDeletion.student_id == student_id, StudentDeletion.status == RUNNING
+            )
+        )
+        if job is not None:
+            # take it over only if its worker is gone
+            claimed = await session.scalar(
+                update(StudentDeletion)
+                .where(StudentDeletion.id == job.id, _orphaned())
+                .values(updated_at=_now())
+                .returning(StudentDeletion.id)
+            )
+            await session.commit()
+            if claimed is not None:
+                _spawn(job.id)
+            return job
+
+        items_total = await session.scalar(
+            select(StudentInventorySummary.item_count)
+            .where(StudentInventorySummary.student_id == student_id)
+        )
+        job = StudentDeletion(student_id=student_id, status=RUNNING, items_total=items_total or 0)
+        session.add(job)
+        await session.commit()
+        # from now on it reads as gone (StudentRepository._visible)
+        StudentRepository(session).invalidate([student_id])
+    _spawn(job.id)
+    return job
+
+
+async def get(job_id: int) -> Optional[StudentDeletion]:
+    async with async_session_factory() as session:
+        return await session.get(StudentDeletion, job_id)
+
+
+async def run(job_id: int) -> None:
+    """
+    Delete the job's items batch by batch, then the student. Failures are
+    recorded on the job (status "failed", `error`); deleting the student
+    again starts a new job that carries on where this one stopped.
+    """
+    batch_size = settings.CASCADE_DELETE_BATCH_SIZE
+    try:
+        async with async_session_factory() as session:
+            student_id = await session.scalar(
+                select(StudentDeletion.student_id).where(StudentDeletion.id == job_id)
+            )
+
+        while True:
+            async with async_session_factory() as session:
+                # walks the (student_id, id) index
+                batch = (
+                    select(Item.id)
+                    .where(Item.student_id == student_id)
+                    .order_by(Item.id)
+                    .limit(batch_size)
+                )
+                result = await session.execute(
+                    delete(Item)
+                    .where(Item.id.in_(batch.scalar_subquery()))
+                    .returning(Item.id)
+                    .execution_options(synchronize_session=False)
+                )
+                deleted = list(result.scalars().all())
+                # progress is committed with the batch, so it is always exact
+                await session.execute(
+                    update(StudentDeletion)
+                    .where(StudentDeletion.id == job_id)
+                    .values(items_deleted=StudentDeletion.items_deleted + len(deleted))
+                )
+                await session.commit()
+                ItemRepository(session).invalidate_deleted(deleted)
+
+            if len(deleted) < batch_size:
+                break
+            if settings.CASCADE_DELETE_PAUSE_MS > 0:
+                await asyncio.sleep(settings.CASCADE_DELETE_PAUSE_MS / 1000)
+
+        async with async_session_factory() as session:
+            # done first: the guard rejects deleting a student whose job is
+            # running. Anything it let through (written before the job
+            # started, committed after) goes with the cascade
+            await session.execute(
+                update(StudentDeletion)
+                .where(StudentDeletion.id == job_id)
+                .values(status=DONE, finished_at=_now())
+            )
+            await session.execute(delete(Student).where(Student.id == student_id))
+            await session.commit()
+            StudentRepository(session).invalidate_deleted([student_id])
+    except asyncio.CancelledError:
+        # shutting down: the job stays "running" and is resumed once orphaned
+        raise
+    except Exception as exc:
+        logger.exception("student deletion job %s failed", job_id)
+        async with async_session_factory() as session:
+            await session.execute(
+                update(StudentDeletion)
+                .where(StudentDeletion.id == job_id)
+                .values(status=FAILED, error=str(exc)[:500], finished_at=_now())
+            )
+            await session.commit()
+
+
+async def resume_orphaned() -> int:
+    """
+    Claim and restart running jobs whose worker is gone; returns how many.
+    """
+    async with async_session_factory() as session:
+        result = await session.execute(
+            update(StudentDeletion)
+            .where(_orphaned())
+            .values(updated_at=_now())
+            .returning(StudentDeletion.id)
+        )
+        job_ids = list(result.scalars().all())
+        await session.commit()
+    for job_id in job_ids:
+        _spawn(job_id)
+    return len(job_ids)
@@ -1,3 +1,5 @@
+from typing import List, Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,6 +7,83 @@ class Settings(BaseSettings):
     # PostgreSQL connection URL for SQLAlchemy
     DATABASE_URL: str
 
+    # SQLAlchemy's per-engine cache of compiled SQL strings (0 disables it)
+    DB_QUERY_CACHE_SIZE: int = 500
+    # log every statement SQLAlchemy sends (synchronously, to stdout); for debugging only
+    DB_ECHO: bool = False
+
+    # SQL telemetry (GET /metrics/sql): per-statement latency histograms and
+    # rows, for up to SQL_TELEMETRY_MAX_STATEMENTS distinct statement shapes.
+    # Statements slower than SLOW_QUERY_MS (0 = never) go to a slow-query log
+    # of the last SLOW_QUERY_LOG_SIZE; with SLOW_QUERY_EXPLAIN slow SELECTs are
+    # also run again under EXPLAIN (ANALYZE, BUFFERS), each shape at most once
+    # per SLOW_QUERY_EXPLAIN_INTERVAL seconds, in a read-only transaction.
+    # Bound parameters (user data) are kept in the slow-query log only with
+    # SLOW_QUERY_LOG_PARAMETERS: /metrics/sql is not authenticated
+    SQL_TELEMETRY: bool = True
+    SQL_TELEMETRY_MAX_STATEMENTS: int = 1000
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = 60.0
+    SLOW_QUERY_LOG_PARAMETERS: bool = False
+
+    # asyncpg prepared statements kept per connection. 0 turns off both the
+    # SQLAlchemy and the asyncpg statement caches and gives every prepared
+    # statement a unique name, as pgbouncer in transaction mode requires
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replicas (comma-separated URLs). Read-only endpoints go there,
+    # falling back to DATABASE_URL when none is configured or healthy.
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_BALANCING: Literal["round_robin", "least_connections"] = "round_robin"
+    # How long a replica that failed to connect is skipped before it is retried
+    REPLICA_RETRY_SECONDS: float = 30.0
+    # How often a replica's replay position may be re-checked for read-your-writes
+    REPLICA_LSN_CHECK_INTERVAL_MS: float = 20.0
+
+    # Bulk create: batches at or above this size are loaded with COPY
+    # instead of a multi-row INSERT ... RETURNING
+    BULK_COPY_THRESHOLD: int = 1000
+    # Upper bound on rows accepted by one bulk request
+    BULK_MAX_ROWS: int = 10000
+    # Rows removed per transaction by filter-based bulk deletes, counting
+    # the items a student delete cascades to
+    DELETE_CHUNK_SIZE: int = 1000
+    # DELETE /students/{id}?mode=async: items removed per transaction by the
+    # background job, an optional pause between batches (lets replicas and
+    # autovacuum keep up), and how long a running job may go without progress
+    # before it counts as orphaned and is picked up again
+    CASCADE_DELETE_BATCH_SIZE: int = 5000
+    CASCADE_DELETE_PAUSE_MS: float = 0.0
+    CASCADE_DELETE_STALE_SECONDS: float = 60.0
+
+    # Seconds an exact COUNT(*) for a given filter is reused
+    COUNT_CACHE_TTL: float = 5.0
+
+    # Per-process cache of serialized GET /{items,students}/{id} payloads.
+    # Writes through this process update it; other workers see changes after the TTL.
+    # ENTITY_CACHE_SIZE=0 turns it off.
+    ENTITY_CACHE_SIZE: int = 10000
+    ENTITY_CACHE_TTL: float = 30.0
+    # For this many seconds after a write through this process, the rows it
+    # touched are served but not cached: the read may come from a replica that
+    # hasn't replayed the write yet, and must not be pinned for the whole TTL
+    ENTITY_CACHE_WRITE_GRACE: float = 5.0
+
+    # Concurrent get-by-id lookups arriving within this window are answered
+    # by one WHERE id = ANY(...) query (0 = same event-loop tick)
+    LOADER_WINDOW_MS: float = 2.0
+    LOADER_MAX_BATCH: int = 100
+
+    # Identical list requests share one query while in flight; a window > 0
+    # also reuses the finished response for that long
+    SINGLEFLIGHT_WINDOW_MS: float = 0.0
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,12 +1,189 @@
 # one-time script — save as create_tables.py and run it
 import asyncio
+from sqlalchemy import text
+
 from src.core.database import engine, Base
+from src.core.reconcile_inventory import reconcile
 from src.models.student import Student   # ← import so it's registered
 from src.models.item import Item          # ← import so it's registered
+from src.models.inventory import StudentInventorySummary  # ← import so it's registered
+from src.models.deletion import StudentDeletion  # ← import so it's registered
+
+# create_all() never alters existing tables, so bring older databases up to date
+UPGRADES = [
+    # timestamps moved from Python-side defaults to server defaults
+    "ALTER TABLE items ALTER COLUMN created_at SET DEFAULT timezone('utc', now())",
+    "ALTER TABLE items ALTER COLUMN updated_at SET DEFAULT timezone('utc', now())",
+    # sortable list column
+    "CREATE INDEX IF NOT EXISTS ix_items_created_at ON items (created_at)",
+    # items of one student (seek pagination) and the cascade from students
+    "CREATE INDEX IF NOT EXISTS ix_items_student_id_id ON items (student_id, id)",
+    # filter deletes of students
+    "CREATE INDEX IF NOT EXISTS ix_students_grade ON students (grade)",
+]
+
+# student_inventory_summary follows every write to items, whichever path it
+# takes: repository calls, COPY bulk loads, upserts, chunked deletes and the
+# ON DELETE CASCADE from students. Statement-level triggers with transition
+# tables apply one delta per student per statement, not one per row.
+# Deletes only UPDATE existing rows: in a cascade the student (and its
+# summary row) may already be gone.
+INVENTORY_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION student_inventory_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO student_inventory_summary AS s
+                (student_id, item_count, total_quantity, total_value)
+            SELECT student_id, count(*), sum(quantity), sum(price::numeric * quantity)
+            FROM new_rows
+            GROUP BY student_id
+            ORDER BY student_id
+            ON CONFLICT (student_id) DO UPDATE SET
+                item_count = s.item_count + EXCLUDED.item_count,
+                total_quantity = s.total_quantity + EXCLUDED.total_quantity,
+                total_value = s.total_value + EXCLUDED.total_value;
+        ELSIF TG_OP = 'UPDATE' THEN
+            -- net change per student; renames and the like change nothing
+            INSERT INTO student_inventory_summary AS s
+                (student_id, item_count, total_quantity, total_value)
+            SELECT student_id, sum(item_count), sum(total_quantity), sum(total_value)
+            FROM (
+                SELECT student_id, 1 AS item_count, quantity AS total_quantity,
+                       price::numeric * quantity AS total_value
+                FROM new_rows
+                UNION ALL
+                SELECT student_id, -1, -quantity, -(price::numeric * quantity)
+                FROM old_rows
+            ) AS delta
+            GROUP BY student_id
+            HAVING sum(item_count) <> 0 OR sum(total_quantity) <> 0 OR sum(total_value) <> 0
+            ORDER BY student_id
+            ON CONFLICT (student_id) DO UPDATE SET
+                item_count = s.item_count + EXCLUDED.item_count,
+                total_quantity = s.total_quantity + EXCLUDED.total_quantity,
+                total_value = s.total_value + EXCLUDED.total_value;
+        ELSE
+            UPDATE student_inventory_summary AS s SET
+                item_count = s.item_count - d.item_count,
+                total_quantity = s.total_quantity - d.total_quantity,
+                total_value = s.total_value - d.total_value
+            FROM (
+                SELECT student_id, count(*) AS item_count, sum(quantity) AS total_quantity,
+                       sum(price::numeric * quantity) AS total_value
+                FROM old_rows
+                GROUP BY student_id
+            ) AS d
+            WHERE s.student_id = d.student_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    # a trigger with transition tables can only have one event
+    "DROP TRIGGER IF EXISTS items_inventory_insert ON items",
+    """
+    CREATE TRIGGER items_inventory_insert AFTER INSERT ON items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_inventory_apply()
+    """,
+    "DROP TRIGGER IF EXISTS items_inventory_update ON items",
+    """
+    CREATE TRIGGER items_inventory_update AFTER UPDATE ON items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_inventory_apply()
+    """,
+    "DROP TRIGGER IF EXISTS items_inventory_delete ON items",
+    """
+    CREATE TRIGGER items_inventory_delete AFTER DELETE ON items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_inventory_apply()
+    """,
+]
+
+# A student whose background deletion is running (see cascade_delete.py)
+# takes no new items, created or moved there, whichever path they come by:
+# the job would have to chase them. The error is a foreign_key_violation -
+# the student is going away - so it surfaces as an IntegrityError, like a
+# student that doesn't exist. Updates only check rows whose student changed.
+# The student row itself can't be updated or deleted either (the routers
+# answer 409), except by the job, which marks itself done first. That one
+# is a BEFORE ROW trigger, so a rejected delete never starts the cascade.
+DELETION_GUARD = [
+    """
+    CREATE OR REPLACE FUNCTION items_reject_deleting_student() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        deleting integer;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT d.student_id INTO deleting
+            FROM student_deletions AS d
+            WHERE d.status = 'running'
+              AND d.student_id IN (SELECT student_id FROM new_rows)
+            LIMIT 1;
+        ELSE
+            SELECT d.student_id INTO deleting
+            FROM new_rows AS n
+            JOIN old_rows AS o ON o.id = n.id AND o.student_id <> n.student_id
+            JOIN student_deletions AS d ON d.student_id = n.student_id AND d.status = 'running'
+            LIMIT 1;
+        END IF;
+        IF deleting IS NOT NULL THEN
+            RAISE EXCEPTION 'student % is being deleted', deleting
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS items_deletion_guard_insert ON items",
+    """
+    CREATE TRIGGER items_deletion_guard_insert AFTER INSERT ON items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION items_reject_deleting_student()
+    """,
+    "DROP TRIGGER IF EXISTS items_deletion_guard_update ON items",
+    """
+    CREATE TRIGGER items_deletion_guard_update AFTER UPDATE ON items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION items_reject_deleting_student()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION students_reject_deleting() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM student_deletions AS d
+            WHERE d.student_id = OLD.id AND d.status = 'running'
+        ) THEN
+            RAISE EXCEPTION 'student % is being deleted', OLD.id
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        RETURN CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS students_deletion_guard ON students",
+    """
+    CREATE TRIGGER students_deletion_guard BEFORE UPDATE OR DELETE ON students
+    FOR EACH ROW EXECUTE FUNCTION students_reject_deleting()
+    """,
+]
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for statement in UPGRADES + INVENTORY_TRIGGERS + DELETION_GUARD:
+            await conn.execute(text(statement))
+        # first run on a database that already has items: fill the new table
+        unfilled = await conn.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM items)"
+            " AND NOT EXISTS (SELECT 1 FROM student_inventory_summary)"
+        ))
+        if unfilled:
+            await reconcile(conn)
 
 if __name__ == "__main__":
     asyncio.run(init_db())
@@ -1,15 +1,67 @@
-from sqlalchemy.ext.asyncio import AsyncSession,create_async_engine,async_sessionmaker
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine,AsyncSession,create_async_engine,async_sessionmaker
 
 from sqlalchemy.orm import DeclarativeBase
 #orm is object-relational mapping, it is a technique that allows you to interact with a database using object-oriented programming concepts. It provides a way to map database tables to Python classes and allows you to perform database operations using Python objects instead of writing raw SQL queries.
 
 from src.core.config import settings
+from src.core.telemetry import sql_telemetry
 
 #create_async_engine --> async_sessionmaker --> AsyncSession
 
+
+def _connect_args(url: str) -> dict:
+    # asyncpg prepares every statement; keeping them cached per connection skips parse/plan on reuse
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.DB_PREPARED_STATEMENT_CACHE_SIZE > 0:
+        return {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    # pgbouncer in transaction mode hands each transaction any server
+    # connection, where a prepared statement may be missing or already
+    # exist under the same name. Both caches have to go - SQLAlchemy's and
+    # asyncpg's own (statement_cache_size) - and the statements asyncpg
+    # still prepares for a single execution need names no other client uses
+    return {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def make_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    Engine with the project's settings; used for the primary and the replicas.
+    """
+    new_engine=create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        # compiled SQL strings are cached per statement shape, so repeated queries skip compilation
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(url),
+        **kwargs,
+    )
+    event.listen(new_engine.sync_engine, "after_cursor_execute", _count_compiled_cache)
+    if settings.SQL_TELEMETRY:
+        sql_telemetry.instrument(new_engine)
+    return new_engine
+
+
+# how often statements were served from the compiled cache, see cache_stats()
+_compiled_cache_counts={stat.name.lower(): 0 for stat in CacheStats}
+
+
+def _count_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        _compiled_cache_counts[CacheStats(context.cache_hit).name.lower()] += 1
+
+
 # crate_async_engine to connect to the database
 #check_same_thread=False is used to allow multiple threads to access the database at the same time. It is necessary when using SQLite in a multi-threaded environment, as SQLite does not allow multiple threads to access the same database file simultaneously by default.
-engine=create_async_engine(settings.DATABASE_URL,echo=True)
+engine=make_engine(settings.DATABASE_URL)
 
 #async_sessionmaker to create a session for interacting with the database
 #expire_on_commit=False is used to prevent the session from expiring the objects after a commit. This means that the objects will still be available in the session after a commit, and you can continue to work with them without having to refresh them from the database.
@@ -19,3 +71,25 @@ async_session_factory=async_sessionmaker(engine,expire_on_commit=False,class_=As
 
 class Base(DeclarativeBase):
     pass
+
+
+def cache_stats() -> dict:
+    """
+    Compiled-statement cache hit rate for this worker, plus the configured
+    prepared statement cache. asyncpg doesn't expose prepared statement hits.
+    """
+    hits=_compiled_cache_counts["cache_hit"]
+    misses=_compiled_cache_counts["cache_miss"]
+    compiled_cache=getattr(engine.sync_engine, "_compiled_cache", None)
+    return {
+        "compiled_cache": {
+            **_compiled_cache_counts,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "size": len(compiled_cache) if compiled_cache is not None else 0,
+            "capacity": settings.DB_QUERY_CACHE_SIZE,
+        },
+        "prepared_statement_cache": {
+            "driver": engine.dialect.driver,
+            "size_per_connection": _connect_args(settings.DATABASE_URL).get("prepared_statement_cache_size"),
+        },
+    }
@@ -0,0 +1,53 @@
+# src/core/reconcile_inventory.py
+"""
+Rebuild student_inventory_summary from scratch out of `items`.
+
+    python -m src.core.reconcile_inventory
+
+The triggers keep the table exact, so this is for repairs: after a restore,
+after items were changed with the triggers disabled, or to check a suspicion.
+It runs in one transaction. TRUNCATE locks the summary table, so writes to
+items wait for the rebuild instead of applying deltas to a half-built table,
+and every item committed before the rebuild started is counted in it.
+Dashboard reads of the summary wait too; it takes seconds on 10M items.
+"""
+import asyncio
+
+from sqlalchemy import Numeric, cast, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.core.database import engine
+from src.models.inventory import StudentInventorySummary
+from src.models.item import Item
+from src.models.student import Student  # ← import so Item's relationship resolves
+
+REBUILD = insert(StudentInventorySummary).from_select(
+    ["student_id", "item_count", "total_quantity", "total_value"],
+    select(
+        Item.student_id,
+        func.count(),
+        func.sum(Item.quantity),
+        # same arithmetic as the triggers, so both give identical totals
+        func.sum(cast(Item.price, Numeric) * Item.quantity),
+    ).group_by(Item.student_id),
+)
+
+
+async def reconcile(conn: AsyncConnection) -> int:
+    """
+    Replace the summary rows with fresh aggregates; returns the row count.
+    The caller commits.
+    """
+    await conn.execute(text("TRUNCATE student_inventory_summary"))
+    result = await conn.execute(REBUILD)
+    return result.rowcount
+
+
+async def main() -> None:
+    async with engine.begin() as conn:
+        rows = await reconcile(conn)
+    print(f"student_inventory_summary rebuilt: {rows} students")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
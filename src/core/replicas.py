@@ -0,0 +1,178 @@
+# src/core/replicas.py
+"""
+Read-replica routing.
+
+`read_session_factory()` is the read-only counterpart of
+`async_session_factory()`: it hands out a session bound to one of the
+replicas in DATABASE_REPLICA_URLS (round-robin or least-connections), and
+to the primary when there are none or none of them is healthy. A replica
+that fails to connect is skipped for REPLICA_RETRY_SECONDS.
+
+Read-your-writes: write endpoints send the primary's WAL LSN after commit
+in the X-Consistency-Token header. A read that passes it back is served by a
+replica only once that replica has replayed past the LSN, else by the primary.
+"""
+import itertools
+import time
+from typing import List, Optional
+
+from fastapi import Response
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import engine, make_engine
+
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+_CURRENT_LSN = text("SELECT pg_current_wal_lsn()::text")
+_REPLAY_LSN = text("SELECT pg_last_wal_replay_lsn()::text")
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    '16/B374D848' -> comparable int. Raises ValueError if it isn't an LSN.
+    """
+    high, _, low = lsn.partition("/")
+    if not low:
+        raise ValueError(f"Invalid consistency token: {lsn!r}")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        # replicas restart and fail over more often than the primary; check connections
+        self.engine = make_engine(url, pool_pre_ping=True)
+        self.down_until = 0.0
+        self.selected = 0
+        self.failures = 0
+        # last replayed WAL position we saw, and when we asked
+        self.replay_lsn = 0
+        self.replay_checked_at = 0.0
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+
+    async def refresh_replay_lsn(self) -> int:
+        if time.monotonic() - self.replay_checked_at < settings.REPLICA_LSN_CHECK_INTERVAL_MS / 1000:
+            return self.replay_lsn
+        try:
+            async with self.engine.connect() as conn:
+                value = (await conn.execute(_REPLAY_LSN)).scalar_one_or_none()
+        except (OSError, DBAPIError):
+            # handle_error has marked us down already
+            return self.replay_lsn
+        self.replay_checked_at = time.monotonic()
+        self.replay_lsn = parse_lsn(value) if value else 0
+        return self.replay_lsn
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    @property
+    def in_use(self) -> int:
+        return self.engine.pool.checkedout()
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or isinstance(context.original_exception, OSError):
+            self.failures += 1
+            self.down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    def stats(self) -> dict:
+        return {
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "in_use": self.in_use,
+            "selected": self.selected,
+            "failures": self.failures,
+            "replay_lsn": f"{self.replay_lsn >> 32:X}/{self.replay_lsn & 0xFFFFFFFF:X}",
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str], balancing: str = "round_robin"):
+        self.replicas = [Replica(url) for url in urls]
+        self.balancing = balancing
+        self._turn = itertools.count()
+        self.primary_fallbacks = 0
+        self.consistency_fallbacks = 0
+
+    def pick(self, candidates: Optional[List[Replica]] = None) -> AsyncEngine:
+        healthy = [
+            replica for replica in (self.replicas if candidates is None else candidates)
+            if replica.healthy
+        ]
+        if not healthy:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return engine
+
+        if self.balancing == "least_connections":
+            replica = min(healthy, key=lambda r: r.in_use)
+        else:
+            replica = healthy[next(self._turn) % len(healthy)]
+        replica.selected += 1
+        return replica.engine
+
+    async def pick_consistent(self, token: str) -> AsyncEngine:
+        """
+        A replica that has replayed past `token`, or the primary.
+        Raises ValueError for a malformed token.
+        """
+        wanted = parse_lsn(token)
+        caught_up = []
+        for replica in self.replicas:
+            if not replica.healthy:
+                continue
+            if replica.replay_lsn >= wanted or await replica.refresh_replay_lsn() >= wanted:
+                caught_up.append(replica)
+        if not caught_up:
+            if self.replicas:
+                self.consistency_fallbacks += 1
+            return engine
+        return self.pick(caught_up)
+
+    def stats(self) -> dict:
+        return {
+            "balancing": self.balancing,
+            "replicas": [replica.stats() for replica in self.replicas],
+            "primary_fallbacks": self.primary_fallbacks,
+            "consistency_fallbacks": self.consistency_fallbacks,
+        }
+
+
+replica_router = ReplicaRouter(settings.replica_urls, settings.REPLICA_BALANCING)
+
+# bound per call to whichever engine the router picks
+_read_sessionmaker = async_sessionmaker(expire_on_commit=False, class_=AsyncSession)
+
+
+def read_session_factory() -> AsyncSession:
+    """
+    Session for read-only work; use async_session_factory() for anything that writes.
+    """
+    return _read_sessionmaker(bind=replica_router.pick())
+
+
+async def consistent_read_session(token: Optional[str]) -> AsyncSession:
+    """
+    read_session_factory() that honours a consistency token from a previous
+    write. Raises ValueError for a malformed token.
+    """
+    if not token:
+        return read_session_factory()
+    return _read_sessionmaker(bind=await replica_router.pick_consistent(token))
+
+
+async def stamp_consistency_token(session: AsyncSession, response: Response) -> None:
+    """
+    After a committed write, send the primary's WAL position so the client can
+    read its own write from a replica. No-op (and no query) without replicas.
+    """
+    if not replica_router.replicas:
+        return
+    lsn = (await session.execute(_CURRENT_LSN)).scalar_one()
+    response.headers[CONSISTENCY_HEADER] = lsn
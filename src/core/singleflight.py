@@ -0,0 +1,68 @@
+# src/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+# every SingleFlight by name, for the metrics endpoint
+flights: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent work.
+
+    `do(key, fn)` runs `fn()` once per key while it is in flight; every other
+    caller with the same key awaits that same result. With `window` > 0 the
+    result is also reused for that many seconds after it completes.
+    A caller that is cancelled (client went away) doesn't cancel the shared
+    work for the others.
+    """
+
+    def __init__(self, name: str, window: Optional[float] = None):
+        self.name = name
+        self.window = settings.SINGLEFLIGHT_WINDOW_MS / 1000 if window is None else window
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._recent = TTLCache(maxsize=1024, ttl=self.window) if self.window > 0 else None
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        flights[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if self._recent is not None:
+            found = self._recent.get(key, _MISSING)
+            if found is not _MISSING:
+                self.coalesced += 1
+                return found
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._recent is not None:
+            self._recent.set(key, task.result())
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "window_ms": self.window * 1000,
+        }
+
+
+_MISSING = object()
@@ -0,0 +1,262 @@
+# src/core/telemetry.py
+"""
+SQL statement telemetry, see GET /metrics/sql.
+
+Every statement sent to Postgres is timed between SQLAlchemy's
+before_cursor_execute and after_cursor_execute events and recorded under
+its fingerprint: the SQL with literals, parameters and IN/VALUES lists
+collapsed, so "WHERE id = $1" is one entry whatever the id. Per
+fingerprint: calls, total/max time, a latency histogram and rows returned
+(or affected). Statements slower than SLOW_QUERY_MS also go to a bounded
+slow-query log, optionally with an EXPLAIN (ANALYZE, BUFFERS) of them.
+EXPLAIN ANALYZE executes the statement, so it only runs for SELECTs without
+a locking clause, inside a READ ONLY transaction that is rolled back: a
+SELECT calling nextval() or setval() fails there instead of moving the
+sequence.
+
+Numbers are per worker process and cover time spent in the driver and on
+the server, not building the statement or loading ORM objects.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# histogram bucket upper bounds, milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+# fingerprints beyond SQL_TELEMETRY_MAX_STATEMENTS are counted here
+OTHER = "other"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):[A-Za-z_]\w*")
+# "VALUES (?, ?), (?, ?), ..." (multi-row VALUES, also in UPDATE ... FROM)
+# and "IN (?, ?, ?)"; other parenthesized lists are part of the statement
+_ROWS = re.compile(r"(\bVALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_LIST = re.compile(r"\((?:\s*\?(?:::\w+)?\s*,)+\s*\?(?:::\w+)?\s*\)")
+_SPACE = re.compile(r"\s+")
+# SELECT ... FOR UPDATE / FOR NO KEY UPDATE / FOR SHARE / FOR KEY SHARE
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize(statement: str) -> str:
+    """
+    The statement with every value replaced by ?, whitespace collapsed.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _ROWS.sub(r"\1", sql)
+    sql = _LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    return hashlib.blake2b(normalize(statement).encode(), digest_size=8).hexdigest()
+
+
+class StatementStats:
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        # calls whose row count the driver didn't report (server-side cursors)
+        self.rows_unknown = 0
+        self.slow = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def record(self, ms: float, rows: int) -> None:
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if rows >= 0:
+            self.rows += rows
+        else:
+            self.rows_unknown += 1
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile (None above the last).
+        """
+        if not self.calls:
+            return None
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= q * self.calls:
+                return bound if bound != float("inf") else None
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "statement": self.statement,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "rows": self.rows,
+            "rows_per_call": (
+                round(self.rows / (self.calls - self.rows_unknown), 2)
+                if self.calls > self.rows_unknown else None
+            ),
+            "slow": self.slow,
+            # cumulative, like a Prometheus histogram
+            "histogram": {
+                ("+Inf" if bound == float("inf") else str(bound)): sum(self.buckets[: i + 1])
+                for i, bound in enumerate(BUCKETS_MS)
+            },
+        }
+
+
+class SQLTelemetry:
+    """
+    Collects statement timings from the engines passed to `instrument`.
+    """
+
+    def __init__(self):
+        self.statements: Dict[str, StatementStats] = {}
+        self.slow_queries: Deque[dict] = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+        # fingerprint -> when it was last explained (time.monotonic)
+        self._explained: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.started_at = datetime.now(timezone.utc)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._telemetry_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, "_telemetry_start", None)
+            if start is None:
+                return
+            ms = (time.perf_counter() - start) * 1e3
+            rows = cursor.rowcount if cursor.rowcount is not None else -1
+            key = self.record(statement, ms, rows)
+            if settings.SLOW_QUERY_MS > 0 and ms >= settings.SLOW_QUERY_MS:
+                self.slow_query(engine, key, statement, parameters, ms, rows, executemany)
+
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, statement: str, ms: float, rows: int) -> str:
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            if len(self.statements) >= settings.SQL_TELEMETRY_MAX_STATEMENTS:
+                key = OTHER
+                stats = self.statements.get(OTHER)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(
+                    normalize(statement) if key != OTHER else "(fingerprints over the limit)"
+                )
+        stats.record(ms, rows)
+        return key
+
+    def slow_query(
+        self,
+        engine: AsyncEngine,
+        key: str,
+        statement: str,
+        parameters: Any,
+        ms: float,
+        rows: int,
+        executemany: bool,
+    ) -> None:
+        self.statements[key].slow += 1
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "fingerprint": key,
+            "ms": round(ms, 3),
+            "rows": rows if rows >= 0 else None,
+            "database": engine.url.render_as_string(hide_password=True),
+            "statement": statement[:4000],
+            "parameters": repr(parameters)[:1000] if settings.SLOW_QUERY_LOG_PARAMETERS else None,
+            "plan": None,
+        }
+        self.slow_queries.append(entry)
+        logger.warning("slow query %s (%.1f ms): %s", key, ms, normalize(statement)[:500])
+
+        if settings.SLOW_QUERY_EXPLAIN and not executemany and self._should_explain(key, statement):
+            task = asyncio.get_running_loop().create_task(
+                self._explain(engine, statement, parameters, entry)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, key: str, statement: str) -> bool:
+        # EXPLAIN ANALYZE runs the statement again: only plain reads (row
+        # locks would be taken again), each fingerprint at most once per interval
+        if not statement.lstrip().upper().startswith("SELECT") or _LOCKING.search(statement):
+            return False
+        now = time.monotonic()
+        last = self._explained.get(key)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        self._explained[key] = now
+        return True
+
+    async def _explain(
+        self, engine: AsyncEngine, statement: str, parameters: Any, entry: dict
+    ) -> None:
+        # on a connection of its own, after the fact; read only, so writes
+        # hidden in the SELECT (nextval, setval, ...) fail; rolled back either way
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                entry["plan"] = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception as exc:
+            entry["plan"] = f"EXPLAIN failed: {exc}"
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.slow_queries.clear()
+        self._explained.clear()
+        self.started_at = datetime.now(timezone.utc)
+
+    def stats(self, limit: int = 50, order_by: str = "total_ms") -> dict:
+        statements = [
+            {"fingerprint": key, **stats.stats()} for key, stats in self.statements.items()
+        ]
+        statements.sort(key=lambda item: item[order_by] or 0, reverse=True)
+        return {
+            "since": self.started_at.isoformat(),
+            "slow_query_ms": settings.SLOW_QUERY_MS,
+            "fingerprints": len(statements),
+            "calls": sum(item["calls"] for item in statements),
+            "statements": statements[:limit],
+            "slow_queries": list(reversed(self.slow_queries)),
+        }
+
+
+sql_telemetry = SQLTelemetry()
@@ -1,10 +1,16 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, Sequence, Any
 
+from sqlalchemy import exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.deletion import StudentDeletion
 from src.models.item import Item
-from src.schemas.item import ItemCreate, ItemUpdate
+from src.schemas.item import (
+    ItemCreate, ItemUpdate, ItemUpsert, ItemBulkUpdate, ItemOut
+)
+from src.core.cache import entity_cache
 from src.crud.baserepository import BaseRepository
+from src.crud.filters import EQUALITY, RANGE, TEXT
 
 
 class ItemRepository(BaseRepository[Item]):
@@ -12,17 +18,110 @@ class ItemRepository(BaseRepository[Item]):
     Item-specific repository – inherits common CRUD from BaseRepository
     """
 
+    filterable = {
+        "name": TEXT,
+        "price": RANGE,
+        "quantity": RANGE,
+        "student_id": EQUALITY,
+        "created_at": RANGE,
+        "updated_at": RANGE,
+    }
+
+    out_schema = ItemOut
+    cache = entity_cache()
+    # deleting a student cascades to its items
+    cache_parent = "student_id"
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, Item)
 
     async def create(self, item_data: ItemCreate) -> Item:
         return await super().create(item_data.model_dump())
 
-    async def get_by_id(self, item_id: int) -> Optional[Item]:
-        return await super().get_by_id(item_id)
+    async def create_many(self, items: List[ItemCreate]) -> List[Item]:
+        return await super().create_many([item.model_dump() for item in items])
+
+    async def get_by_id(self, item_id: int, include: Sequence[str] = ()) -> Optional[Item]:
+        return await super().get_by_id(item_id, include=include)
+
+    async def get_many(self, item_ids: List[int]) -> List[Item]:
+        return await super().get_many(item_ids)
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+    ) -> List[Item]:
+        return await super().get_all(
+            skip=skip, limit=limit, order_by_column=order_by, fields=fields, where=where,
+            include=include,
+        )
+
+    async def get_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+    ) -> Tuple[List[Item], Optional[str]]:
+        return await super().get_page(
+            limit=limit, cursor=cursor, order_by=order_by, fields=fields, where=where,
+            include=include,
+        )
 
-    async def get_all(self, skip: int = 0, limit: int = 50) -> List[Item]:
-        return await super().get_all(skip=skip, limit=limit)
+    async def get_page_for_student(
+        self,
+        student_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Item], Optional[str]]:
+        """
+        Keyset page of one student's items, ordered by id (or -id): a range
+        scan of ix_items_student_id_id, however deep the cursor. Empty while
+        the student is being deleted (it reads as missing then).
+        """
+        return await super().get_page(
+            limit=limit, cursor=cursor, order_by=order_by, fields=fields,
+            where=[
+                Item.student_id == student_id,
+                # not correlated to the rows: checked once per query
+                ~exists().where(
+                    StudentDeletion.student_id == student_id, StudentDeletion.status == "running"
+                ),
+            ],
+        )
+
+    async def get_all_json(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int]:
+        return await super().get_all_json(
+            skip=skip, limit=limit, order_by_column=order_by, fields=fields, where=where
+        )
+
+    async def get_page_json(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int, Optional[str]]:
+        return await super().get_page_json(
+            limit=limit, cursor=cursor, order_by=order_by, fields=fields, where=where
+        )
 
     async def update(
         self, item_id: int, update_data: ItemUpdate
@@ -30,5 +129,21 @@ class ItemRepository(BaseRepository[Item]):
         values = update_data.model_dump(exclude_unset=True)
         return await super().update(item_id, values)
 
+    async def upsert_many(self, items: List[ItemUpsert]) -> List[Item]:
+        return await super().upsert_many([item.model_dump() for item in items])
+
+    async def update_many(self, updates: List[ItemBulkUpdate]) -> List[Item]:
+        return await super().update_many(
+            [update.model_dump(exclude_unset=True) for update in updates]
+        )
+
     async def delete(self, item_id: int) -> Optional[Item]:
         return await super().delete(item_id)
+
+    async def delete_many(self, item_ids: List[int]) -> List[int]:
+        return await super().delete_many(item_ids)
+
+    async def delete_where(
+        self, where: dict, chunk_size: Optional[int] = None
+    ) -> List[int]:
+        return await super().delete_where(where, chunk_size=chunk_size)
@@ -1,12 +1,39 @@
 # src/crud/repository.py
-from typing import Generic, TypeVar, Optional, List, Any
+import json
+from types import SimpleNamespace
+from typing import (
+    Generic, TypeVar, Optional, List, Any, Sequence, Tuple, Dict, Set, Iterable, AsyncIterator,
+    Callable,
+)
 
-from sqlalchemy import select, update, delete
+import asyncpg
+from sqlalchemy import (
+    select, update, delete, insert, func, any_, bindparam, cast, values, column,
+    text, true, Integer,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import DeclarativeBase, joinedload, selectinload
+from pydantic import BaseModel
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.replicas import read_session_factory
+from src.crud import pagination, filters, jsonsql
+from src.crud.loader import BatchLoader
 
 T = TypeVar("T", bound=DeclarativeBase)
 
+# key in `_written` standing for every id of the model
+ALL_IDS = object()
+
+# asyncpg (the Postgres protocol) accepts at most this many parameters per statement
+_MAX_BIND_PARAMS = 32767
+
+_RELTUPLES = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)")
+
 
 class BaseRepository(Generic[T]):
     """
@@ -14,36 +41,634 @@ class BaseRepository(Generic[T]):
     You can inherit from this for each model.
     """
 
+    # column -> allowed operators for list filters (see src/crud/filters.py)
+    filterable: Dict[str, Set[str]] = {}
+
+    # exact counts keyed by the rendered COUNT statement, shared by all repositories
+    count_cache = TTLCache(maxsize=1024, ttl=settings.COUNT_CACHE_TTL)
+
+    # get_payload: response schema and the per-model cache of serialized rows
+    out_schema: Optional[type[BaseModel]] = None
+    cache: Optional[TTLCache] = None
+
+    # coalesces concurrent `load` calls; every subclass gets its own
+    loader: Optional[BatchLoader] = None
+
+    # ids written recently through this process (ALL_IDS: every id), which
+    # get_payload doesn't cache; see ENTITY_CACHE_WRITE_GRACE
+    _written: Optional[TTLCache] = None
+
+    # column holding the parent whose delete cascades to this model (items:
+    # student_id). Cached payloads then keep the parent id, and the parents
+    # deleted recently (see invalidate_parents) make them misses
+    cache_parent: Optional[str] = None
+    _parents_deleted: Optional[TTLCache] = None
+
+    # named sets of computed columns for list selects (e.g. ?with=stats): each
+    # builds a LATERAL subquery correlated to the model's table
+    computed: Dict[str, Callable[[], Any]] = {}
+
+    # hot-path statements that differ only by parameters, built once per model
+    _statements: Dict[Tuple[type, str], Any] = {}
+
     def __init__(self, session: AsyncSession, model: type[T]):
         self.session = session
         self.model = model
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.loader = BatchLoader(cls._load_batch, bad_key=cls._bad_key)
+        if cls.cache is not None and settings.ENTITY_CACHE_WRITE_GRACE > 0:
+            cls._written = TTLCache(
+                maxsize=cls.cache.maxsize, ttl=settings.ENTITY_CACHE_WRITE_GRACE
+            )
+        if cls.cache is not None and cls.cache_parent is not None:
+            # outlives every payload cached before the delete, and the grace
+            # period for lagging replicas after it
+            cls._parents_deleted = TTLCache(
+                maxsize=cls.cache.maxsize,
+                ttl=max(cls.cache.ttl, settings.ENTITY_CACHE_WRITE_GRACE),
+            )
+
+    def _statement(self, name: str, build):
+        key = (self.model, name)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._statements[key] = build()
+        return stmt
+
+    @staticmethod
+    def _bad_key(error: BaseException) -> bool:
+        # an id the database can't take (out of range, wrong type) is a data
+        # exception, SQLSTATE class 22; connection and other errors are not
+        if isinstance(error, DBAPIError):
+            return str(getattr(error.orig, "sqlstate", None) or "").startswith("22")
+        return isinstance(error, (LookupError, ValueError, TypeError))
+
+    @classmethod
+    async def _load_batch(cls, ids: List[Any]) -> Dict[Any, T]:
+        # runs in its own (read) session: the batch serves many requests at once
+        async with read_session_factory() as session:
+            instances = await cls(session).get_many(ids)
+        return {instance.id: instance for instance in instances}
+
     async def create(self, data: dict) -> T:
-        instance = self.model(**data)
-        self.session.add(instance)
+        # INSERT ... RETURNING brings back id and server defaults
+        # (timestamps) in the same round trip, no refresh needed
+        result = await self.session.execute(
+            insert(self.model).values(**data).returning(self.model)
+        )
+        instance = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(instance)
         return instance
 
-    async def get_by_id(self, id_value: Any) -> Optional[T]:
-        result = await self.session.execute(
-            select(self.model).where(self.model.id == id_value)
+    async def create_many(self, rows: List[dict]) -> List[T]:
+        """
+        Insert many rows in one transaction and return them in input order.
+        Small batches use a single multi-row INSERT ... RETURNING; large ones
+        (BULK_COPY_THRESHOLD and up) are streamed with asyncpg's binary COPY.
+        """
+        if not rows:
+            return []
+
+        if len(rows) >= settings.BULK_COPY_THRESHOLD and self._supports_copy():
+            instances = await self._copy_many(rows)
+        else:
+            result = await self.session.execute(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                rows,
+            )
+            instances = list(result.scalars().all())
+
+        await self.session.commit()
+        return instances
+
+    def _supports_copy(self) -> bool:
+        return self.session.bind.dialect.driver == "asyncpg"
+
+    def _id_in(self, ids: List[Any], column=None):
+        # id = ANY($1): one array parameter instead of one bind per id
+        column = self.model.id if column is None else column
+        return column == any_(bindparam("ids", list(ids), type_=ARRAY(Integer), unique=True))
+
+    async def _copy_many(self, rows: List[dict]) -> List[T]:
+        table = self.model.__table__
+        conn = await self.session.connection()
+
+        # COPY cannot return generated keys, so reserve them up front
+        id_result = await conn.execute(
+            select(func.nextval(func.pg_get_serial_sequence(table.name, "id")))
+            .select_from(func.generate_series(1, len(rows)))
+        )
+        ids = list(id_result.scalars().all())
+
+        columns = ["id", *rows[0].keys()]
+        # Python-side column defaults are not known to Postgres, apply them here
+        defaulted = [
+            table_column for table_column in table.c
+            if table_column.name not in columns and table_column.default is not None
+        ]
+        records = []
+        for id_value, row in zip(ids, rows):
+            record = [id_value, *(row.get(name) for name in columns[1:])]
+            for table_column in defaulted:
+                default = table_column.default
+                record.append(default.arg(None) if default.is_callable else default.arg)
+            records.append(tuple(record))
+        columns += [table_column.name for table_column in defaulted]
+
+        raw = await conn.get_raw_connection()
+        try:
+            await raw.driver_connection.copy_records_to_table(
+                table.name, records=records, columns=columns
+            )
+        except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as exc:
+            # the driver is called directly, so wrap its errors the way
+            # SQLAlchemy does for the INSERT path (routers map IntegrityError)
+            wrapper = (
+                IntegrityError
+                if isinstance(exc, asyncpg.IntegrityConstraintViolationError)
+                else DataError
+            )
+            statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+            raise wrapper(statement, None, exc) from exc
+
+        result = await self.session.execute(select(self.model).where(self._id_in(ids)))
+        by_id = {instance.id: instance for instance in result.scalars().all()}
+        return [by_id[id_value] for id_value in ids]
+
+    async def get_by_id(self, id_value: Any, include: Sequence[str] = ()) -> Optional[T]:
+        """
+        One row by id, with the relationships named in `include` loaded.
+        Raises ValueError for an unknown relationship.
+        """
+        stmt = self._statement(
+            "get_by_id:" + ",".join(include),
+            lambda: (
+                self._select(include=include)
+                .where(self.model.id == bindparam("id_value"), *self._visible())
+            ),
         )
+        result = await self.session.execute(stmt, {"id_value": id_value})
         return result.scalar_one_or_none()
 
+    async def get_many(self, ids: List[Any]) -> List[T]:
+        """
+        SELECT ... WHERE id = ANY($1). Unknown ids are skipped, order is not kept.
+        """
+        if not ids:
+            return []
+        stmt = self._statement(
+            "get_many",
+            lambda: select(self.model).where(
+                self.model.id == any_(bindparam("ids", type_=ARRAY(Integer))),
+                *self._visible(),
+            ),
+        )
+        result = await self.session.execute(stmt, {"ids": list(ids)})
+        return list(result.scalars().all())
+
+    def _visible(self) -> tuple:
+        """
+        Extra conditions for every read (by id, lists, streams, JSON pages
+        and counts): rows they exclude read as missing. None by default.
+        """
+        return ()
+
+    async def load(self, id_value: Any) -> Optional[T]:
+        """
+        Like get_by_id, but batched with other concurrent `load` calls into one
+        query (see BatchLoader). The returned object is detached, so use it
+        for reading only; use get_by_id inside a unit of work.
+        """
+        return await self.loader.load(id_value)
+
+    async def get_payload(self, id_value: Any, fresh: bool = False) -> Optional[bytes]:
+        """
+        get_by_id already serialized with `out_schema` (JSON bytes). Served
+        from `cache` when possible, so a hit skips the query, the validation
+        and the JSON encoding. Writes through the repository invalidate it,
+        and rows they touched aren't cached again for ENTITY_CACHE_WRITE_GRACE
+        seconds, since the read may come from a lagging replica.
+        `fresh=True` skips the cache and the batch loader and reads through
+        this repository's own session (e.g. one that must see a recent write).
+        """
+        if self.cache is not None and not fresh:
+            payload = self._cached(id_value)
+            if payload is not None:
+                return payload
+
+        instance = await (self.get_by_id(id_value) if fresh else self.load(id_value))
+        if instance is None:
+            return None
+        payload = self.out_schema.model_validate(instance).model_dump_json().encode()
+        if self.cache is not None and not self._recently_written(id_value):
+            if self.cache_parent is None:
+                self.cache.set(id_value, payload)
+            else:
+                parent = getattr(instance, self.cache_parent)
+                if self._parents_deleted.get(parent) is None:
+                    self.cache.set(id_value, (payload, parent))
+        return payload
+
+    def _cached(self, id_value: Any) -> Optional[bytes]:
+        entry = self.cache.get(id_value)
+        if entry is None or self.cache_parent is None:
+            return entry
+        payload, parent = entry
+        if self._parents_deleted.get(parent) is not None:
+            self.cache.pop(id_value)
+            return None
+        return payload
+
+    def _recently_written(self, id_value: Any) -> bool:
+        if self._written is None:
+            return False
+        return self._written.get(id_value) is not None or self._written.get(ALL_IDS) is not None
+
+    def invalidate(self, ids: Iterable[Any]) -> None:
+        """
+        Drop the cached payloads of `ids` after a write made outside the
+        repository's own methods (which do this themselves), or one that
+        changes what they read, e.g. a student marked as being deleted.
+        """
+        if self.cache is not None:
+            for id_value in ids:
+                self.cache.pop(id_value)
+                if self._written is not None:
+                    self._written.set(id_value, True)
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        """
+        Drop every cached payload of this model, e.g. after a cascade that
+        deleted rows whose ids we don't know.
+        """
+        if cls.cache is not None:
+            cls.cache.clear()
+            if cls._written is not None:
+                cls._written.set(ALL_IDS, True)
+
+    @classmethod
+    def invalidate_parents(cls, parent_ids: Iterable[Any]) -> None:
+        """
+        Drop the cached payloads whose `cache_parent` is one of `parent_ids`,
+        e.g. the items of deleted students, whose ids we don't know.
+        """
+        if cls._parents_deleted is None:
+            return
+        parent_ids = list(parent_ids)
+        if len(cls._parents_deleted) + len(parent_ids) > cls._parents_deleted.maxsize:
+            # the oldest deletes would be forgotten while their rows may
+            # still be cached
+            cls.invalidate_all()
+        for parent_id in parent_ids:
+            cls._parents_deleted.set(parent_id, True)
+
+    def _delete_weight(self):
+        """
+        Rows deleting one row of this model removes in all, as an SQL
+        expression over the table: 1 plus what ON DELETE CASCADE takes
+        along. None when nothing is cascaded; see delete_where.
+        """
+        return None
+
+    def invalidate_deleted(self, ids: Iterable[Any]) -> None:
+        """
+        invalidate() for deleted rows; models whose deletes cascade into
+        other cached models override it.
+        """
+        self.invalidate(ids)
+
+    def row_fields(self) -> Tuple[str, ...]:
+        """
+        The `out_schema` fields that are columns of the table, in schema order.
+        Passed as `fields`, they make get_all/get_page/stream return full rows
+        as plain Row tuples: the read-only fast path for list endpoints.
+        """
+        columns = self.model.__table__.c
+        return tuple(name for name in self.out_schema.model_fields if name in columns)
+
+    def _include(self, include: Sequence[str]) -> list:
+        """
+        Loader options for the relationships in `include`. Collections get
+        selectinload (one extra SELECT ... WHERE fk IN (...) for the whole
+        result); many-to-one gets joinedload (a JOIN, which can't multiply
+        rows). Raises ValueError for an unknown relationship.
+        """
+        relationships = sa_inspect(self.model).relationships
+        options = []
+        for name in include:
+            if name not in relationships:
+                raise ValueError(
+                    f"Unknown include: {name} (use one of: {', '.join(relationships.keys())})"
+                )
+            relationship = relationships[name]
+            attribute = getattr(self.model, name)
+            if relationship.uselist:
+                options.append(selectinload(attribute))
+            else:
+                required = all(not column.nullable for column in relationship.local_columns)
+                options.append(joinedload(attribute, innerjoin=required))
+        return options
+
+    def _computed(self, name: str):
+        if name not in self.computed:
+            raise ValueError(
+                f"Unknown computed set: {name} (use one of: {', '.join(self.computed)})"
+            )
+        return self.computed[name]()
+
+    def computed_fields(self, names: Sequence[str]) -> Tuple[str, ...]:
+        """
+        Column names the `computed` sets in `names` add to each row.
+        """
+        return tuple(key for name in names for key in self._computed(name).c.keys())
+
+    def _select(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        extra: Sequence[str] = (),
+        include: Sequence[str] = (),
+        computed: Sequence[str] = (),
+    ):
+        """
+        select(self.model) with `include` relationships eagerly loaded, or -
+        when `fields` is given - a Core select of id + fields (+ `extra`,
+        e.g. sort keys) over the table columns, joined with the `computed`
+        subqueries. Rows then come back as Row tuples: no ORM instances, no
+        identity map.
+        """
+        if fields is None:
+            if computed:
+                raise ValueError("computed columns need `fields`")
+            return select(self.model).options(*self._include(include))
+        if include:
+            raise ValueError("include can't be combined with fields")
+        columns = self.model.__table__.c
+        names = list(dict.fromkeys(["id", *fields, *extra]))
+        stmt = select(*(columns[name] for name in names))
+        for name in computed:
+            subquery = self._computed(name)
+            stmt = stmt.add_columns(*subquery.c).join(subquery, true())
+        return stmt
+
+    async def _rows(self, stmt, fields: Optional[Sequence[str]]):
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all() if fields is None else result.all())
+
+    def build_filters(self, params: Iterable[Tuple[str, str]]) -> List[Any]:
+        """
+        Compile query parameters like `price[gte]=10` into predicates,
+        checked against `filterable`. Raises ValueError on anything else.
+        """
+        return filters.compile_filters(self.model, self.filterable, params)
+
+    def check_sort(self, order_by: Sequence[str] | str) -> None:
+        """
+        Raises ValueError unless every sort column leads an index, so a client
+        can't ask for a full-table sort.
+        """
+        allowed = filters.indexed_columns(self.model)
+        for name, _ in pagination.parse_order(self.model, order_by):
+            if name not in allowed:
+                raise ValueError(
+                    f"Sorting on '{name}' is not supported (not indexed); "
+                    f"sortable: {', '.join(sorted(allowed))}"
+                )
+
     async def get_all(
         self,
         skip: int = 0,
         limit: int = 50,
-        order_by_column="id",
+        order_by_column: Sequence[str] | str = "id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+        computed: Sequence[str] = (),
     ) -> List[T]:
-        result = await self.session.execute(
-            select(self.model)
+        """
+        Offset pagination. With `fields`, returns read-only Row objects holding
+        only id + those columns instead of ORM entities (see row_fields).
+        `where` takes predicates from build_filters; `order_by_column` accepts
+        "-created_at,id". `include` eagerly loads relationships (entities only),
+        `computed` adds the named `computed` columns (rows only).
+        """
+        keys = pagination.parse_order(self.model, order_by_column)
+        stmt = (
+            self._select(fields, include=include, computed=computed)
+            .where(*where, *self._visible())
             .offset(skip)
             .limit(limit)
-            .order_by(getattr(self.model, order_by_column))
+            .order_by(*pagination.order_clauses(self.model, keys))
         )
-        return result.scalars().all()
+        return await self._rows(stmt, fields)
+
+    async def get_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by: Sequence[str] | str = ("id",),
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+        computed: Sequence[str] = (),
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Keyset pagination: returns one page and the cursor for the next one
+        (None on the last page). Raises ValueError for a bad cursor.
+        `fields`, `where`, `include` and `computed` work as in get_all.
+        """
+        keys = pagination.parse_order(self.model, order_by)
+        stmt = (
+            self._select(
+                fields, extra=[name for name, _ in keys], include=include, computed=computed
+            )
+            .where(*where, *self._visible())
+            .order_by(*pagination.order_clauses(self.model, keys))
+            .limit(limit + 1)
+        )
+        if cursor:
+            values = pagination.decode_cursor(self.model, keys, cursor)
+            stmt = stmt.where(pagination.seek_predicate(self.model, keys, values))
+
+        rows = await self._rows(stmt, fields)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = pagination.encode_cursor(keys, rows[-1])
+        return rows, next_cursor
+
+    async def get_all_json(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        order_by_column: Sequence[str] | str = "id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int]:
+        """
+        get_all with the JSON built by Postgres: returns the page as an
+        encoded JSON array shaped like `out_schema` (limited to `fields`),
+        ready to be sent as is, and the number of rows in it.
+        """
+        fields = fields or self.row_fields()
+        keys = pagination.parse_order(self.model, order_by_column)
+        rows = (
+            self._select(fields, extra=[name for name, _ in keys])
+            .where(*where, *self._visible())
+            .order_by(*pagination.order_clauses(self.model, keys))
+            .offset(skip)
+            .limit(limit)
+            .subquery("t")
+        )
+        stmt = select(
+            jsonsql.json_array(func.json_agg(aggregate_order_by(
+                jsonsql.json_object(rows, fields),
+                *pagination.order_clauses(self.model, keys, rows),
+            ))),
+            func.count(),
+        )
+        body, returned = (await self.session.execute(stmt)).one()
+        return body.encode(), returned
+
+    async def get_page_json(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by: Sequence[str] | str = ("id",),
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int, Optional[str]]:
+        """
+        get_page with the JSON built by Postgres: returns the encoded items
+        array (see get_all_json), the number of rows in it and the cursor for
+        the next page. Raises ValueError for a bad cursor.
+        """
+        fields = fields or self.row_fields()
+        keys = pagination.parse_order(self.model, order_by)
+        order = pagination.order_clauses(self.model, keys)
+        stmt = (
+            self._select(fields, extra=[name for name, _ in keys])
+            .add_columns(func.row_number().over(order_by=order).label("row_number"))
+            .where(*where, *self._visible())
+            .order_by(*order)
+            .limit(limit + 1)
+        )
+        if cursor:
+            values = pagination.decode_cursor(self.model, keys, cursor)
+            stmt = stmt.where(pagination.seek_predicate(self.model, keys, values))
+        rows = stmt.subquery("t")
+
+        # one extra row tells whether there is a next page; the cursor is
+        # taken from the sort keys of the last row that is on this page,
+        # fetched as typed values so it encodes exactly like get_page's
+        stmt = select(
+            jsonsql.json_array(
+                func.json_agg(aggregate_order_by(
+                    jsonsql.json_object(rows, fields),
+                    *pagination.order_clauses(self.model, keys, rows),
+                )).filter(rows.c.row_number <= limit)
+            ),
+            func.count(),
+            *(
+                func.array_agg(rows.c[name]).filter(rows.c.row_number == limit)
+                for name, _ in keys
+            ),
+        )
+        body, fetched, *last_keys = (await self.session.execute(stmt)).one()
+
+        next_cursor = None
+        if fetched > limit:
+            last = SimpleNamespace(**{
+                name: values[0] for (name, _), values in zip(keys, last_keys)
+            })
+            next_cursor = pagination.encode_cursor(keys, last)
+        return body.encode(), min(fetched, limit), next_cursor
+
+    async def stream(
+        self,
+        order_by: Sequence[str] | str = "id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[list]:
+        """
+        Yield every matching row in chunks of `chunk_size`, read through a
+        server-side cursor, so memory stays flat however many rows match.
+        Closing the iterator (or cancelling the task) closes the cursor.
+        """
+        keys = pagination.parse_order(self.model, order_by)
+        stmt = (
+            self._select(fields)
+            .where(*where, *self._visible())
+            .order_by(*pagination.order_clauses(self.model, keys))
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            rows = result if fields is not None else result.scalars()
+            async for chunk in rows.partitions():
+                yield chunk
+        finally:
+            await result.close()
+
+    async def count(self, where: Sequence[Any] = (), exact: bool = False) -> Tuple[int, bool]:
+        """
+        Number of rows matching `where`, as (count, is_exact).
+
+        By default this is the planner's estimate: pg_class.reltuples without
+        filters, the EXPLAIN row estimate with them. `exact=True` runs a real
+        COUNT(*), cached per filter for COUNT_CACHE_TTL seconds.
+        """
+        if exact:
+            stmt = (
+                select(func.count()).select_from(self.model).where(*where, *self._visible())
+            )
+            sql, parameters = self._compile(stmt)
+            if isinstance(parameters, dict):
+                parameters = tuple(sorted(parameters.items()))
+            key = (sql, repr(parameters))
+            cached = self.count_cache.get(key)
+            if cached is not None:
+                return cached, True
+            total = (await self.session.execute(stmt)).scalar_one()
+            self.count_cache.set(key, total)
+            return total, True
+
+        if not where:
+            result = await self.session.execute(
+                _RELTUPLES, {"name": self.model.__table__.name}
+            )
+            estimate = result.scalar_one_or_none()
+            # -1 means the table was never analyzed; ask the planner instead
+            if estimate is not None and estimate >= 0:
+                return int(estimate), False
+
+        # the compiled statement with its parameters bound, never rendered into the SQL
+        sql, parameters = self._compile(select(self.model.id).where(*where, *self._visible()))
+        conn = await self.session.connection()
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, parameters)
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+
+    def _compile(self, stmt) -> Tuple[str, Any]:
+        """
+        SQL for the session's driver plus its parameters the way
+        exec_driver_sql takes them, with IN lists expanded: a tuple for
+        positional drivers (asyncpg), a dict for named ones (psycopg).
+        """
+        compiled = stmt.compile(
+            dialect=self.session.bind.dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        params = compiled.construct_params()
+        if compiled.positiontup is None:
+            return compiled.string, params
+        return compiled.string, tuple(params[name] for name in compiled.positiontup)
 
     async def update(
         self,
@@ -61,14 +686,230 @@ class BaseRepository(Generic[T]):
         )
         result = await self.session.execute(stmt)
         await self.session.commit()
+        self.invalidate([id_value])
         return result.scalar_one_or_none()
 
+    def _onupdate_values(self) -> dict:
+        """
+        Values for columns with an `onupdate` (e.g. updated_at). Statements
+        built by hand (ON CONFLICT, UPDATE ... FROM) don't get them for free.
+        """
+        result = {}
+        for col in self.model.__table__.c:
+            if col.onupdate is None:
+                continue
+            if col.onupdate.is_callable:
+                result[col.name] = col.onupdate.arg(None)
+            else:
+                result[col.name] = col.onupdate.arg
+        return result
+
+    async def upsert_many(self, rows: List[dict]) -> List[T]:
+        """
+        INSERT ... ON CONFLICT (id) DO UPDATE for a batch of full rows.
+        Rows without an id are plain inserts. Returns rows in input order.
+        Raises ValueError if the same id appears twice in the batch.
+        """
+        if not rows:
+            return []
+
+        keyed = [(i, row) for i, row in enumerate(rows) if row.get("id") is not None]
+        fresh = [
+            (i, {k: v for k, v in row.items() if k != "id"})
+            for i, row in enumerate(rows) if row.get("id") is None
+        ]
+        if len({row["id"] for _, row in keyed}) != len(keyed):
+            raise ValueError("Duplicate id in upsert batch")
+
+        ordered: List[Optional[T]] = [None] * len(rows)
+
+        if keyed:
+            stmt = pg_insert(self.model)
+            set_ = {
+                name: stmt.excluded[name]
+                for name in keyed[0][1]
+                if name != "id" and not self.model.__table__.c[name].primary_key
+            }
+            set_.update(self._onupdate_values())
+            stmt = stmt.on_conflict_do_update(index_elements=["id"], set_=set_)
+            result = await self.session.execute(
+                stmt.returning(self.model, sort_by_parameter_order=True),
+                [row for _, row in keyed],
+                execution_options={"populate_existing": True},
+            )
+            for (i, _), instance in zip(keyed, result.scalars().all()):
+                ordered[i] = instance
+
+            # explicit ids may run ahead of the serial sequence; move it past them
+            table = self.model.__table__
+            sequence = func.pg_get_serial_sequence(table.name, "id")
+            await self.session.execute(
+                select(func.setval(sequence, func.greatest(func.max(table.c.id), func.nextval(sequence))))
+            )
+
+        if fresh:
+            result = await self.session.execute(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                [row for _, row in fresh],
+            )
+            for (i, _), instance in zip(fresh, result.scalars().all()):
+                ordered[i] = instance
+
+        await self.session.commit()
+        self.invalidate(row["id"] for _, row in keyed)
+        return ordered
+
+    async def update_many(self, rows: List[dict]) -> List[T]:
+        """
+        Partial update of many rows in one UPDATE ... FROM (VALUES ...).
+        Each row needs an `id`; fields missing from a row keep their current
+        value. Returns the updated rows in input order, unknown ids are skipped.
+        Raises ValueError if the same id appears twice in the batch.
+        """
+        if not rows:
+            return []
+        if len({row["id"] for row in rows}) != len(rows):
+            raise ValueError("Duplicate id in update batch")
+
+        table = self.model.__table__
+        names = [name for name in table.c.keys() if any(name in row for row in rows) and name != "id"]
+        if not names:
+            return []
+
+        onupdate = {
+            name: value for name, value in self._onupdate_values().items() if name not in names
+        }
+        # one parameter per cell: split big batches into statements that fit,
+        # all in the same transaction
+        chunk_size = (_MAX_BIND_PARAMS - len(onupdate)) // (len(names) + 1)
+
+        by_id = {}
+        for start in range(0, len(rows), chunk_size):
+            batch = values(
+                *(column(name, table.c[name].type) for name in ["id", *names]),
+                name="batch",
+            ).data([
+                tuple(row.get(name) for name in ["id", *names])
+                for row in rows[start:start + chunk_size]
+            ])
+
+            # columns are NOT NULL, so a NULL in the batch means "leave as is"
+            assignments = {
+                name: func.coalesce(cast(batch.c[name], table.c[name].type), table.c[name])
+                for name in names
+            }
+            assignments.update(onupdate)
+
+            stmt = (
+                update(self.model)
+                .where(self.model.id == batch.c.id)
+                .values(**assignments)
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            result = await self.session.execute(stmt)
+            by_id.update((instance.id, instance) for instance in result.scalars().all())
+        await self.session.commit()
+
+        self.invalidate(by_id)
+        return [by_id[row["id"]] for row in rows if row["id"] in by_id]
+
     async def delete(self, id_value: Any) -> Optional[T]:
+        stmt = self._statement(
+            "delete",
+            lambda: (
+                delete(self.model)
+                .where(self.model.id == bindparam("id_value"))
+                .returning(self.model)
+            ),
+        )
+        result = await self.session.execute(stmt, {"id_value": id_value})
+        await self.session.commit()
+        self.invalidate_deleted([id_value])
+        return result.scalar_one_or_none()
+
+    async def delete_many(self, ids: List[Any]) -> List[Any]:
+        """
+        DELETE ... WHERE id = ANY($1) RETURNING id. Returns the ids that existed.
+        """
+        if not ids:
+            return []
         stmt = (
             delete(self.model)
-            .where(self.model.id == id_value)
-            .returning(self.model)
+            .where(self._id_in(ids))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
         )
         result = await self.session.execute(stmt)
         await self.session.commit()
-        return result.scalar_one_or_none()
\ No newline at end of file
+        deleted = list(result.scalars().all())
+        self.invalidate_deleted(deleted)
+        return deleted
+
+    async def delete_where(
+        self,
+        where: dict,
+        chunk_size: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Delete every row matching `where` (column == value) in chunks of
+        about `chunk_size` rows, one transaction per chunk, so locks are held
+        only briefly. Rows the ON DELETE CASCADE takes along count too (see
+        _delete_weight); a row heavier than that goes in a chunk of its own.
+        Returns the deleted ids. Raises ValueError for an empty filter, a
+        bad value, or a column that is not `filterable` or not indexed:
+        every chunk looks its rows up again, which without an index is a
+        scan of the whole table each time.
+        """
+        if not where:
+            raise ValueError("At least one filter is required")
+        indexed = filters.indexed_columns(self.model)
+        predicates = filters.equality_filters(
+            self.model,
+            {name: ops for name, ops in self.filterable.items() if name in indexed},
+            where,
+        )
+
+        chunk_size = chunk_size or settings.DELETE_CHUNK_SIZE
+        candidates = (
+            select(self.model.id)
+            # rows that read as missing are left alone (e.g. a student whose
+            # background deletion is running deletes itself)
+            .where(*predicates, *self._visible())
+            .order_by(self.model.id)
+            .limit(chunk_size)
+        )
+        weight = self._delete_weight()
+        if weight is None:
+            batch = candidates.scalar_subquery()
+        else:
+            # the longest run of candidates whose weights fit in chunk_size,
+            # and always the first one
+            candidates = candidates.add_columns(weight.label("weight")).subquery()
+            sized = select(
+                candidates.c.id,
+                candidates.c.weight,
+                func.sum(candidates.c.weight).over(order_by=candidates.c.id).label("running"),
+            ).subquery()
+            batch = (
+                select(sized.c.id)
+                .where((sized.c.running <= chunk_size) | (sized.c.running == sized.c.weight))
+                .scalar_subquery()
+            )
+        stmt = (
+            delete(self.model)
+            .where(self.model.id.in_(batch))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        deleted: List[Any] = []
+        while True:
+            result = await self.session.execute(stmt)
+            chunk = list(result.scalars().all())
+            await self.session.commit()
+            self.invalidate_deleted(chunk)
+            deleted.extend(chunk)
+            # a weighed chunk can be short with more rows to go
+            if not chunk or (weight is None and len(chunk) < chunk_size):
+                return deleted
\ No newline at end of file
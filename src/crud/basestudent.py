@@ -1,11 +1,44 @@
 # src/crud/student.py
-from typing import List, Optional
+from typing import List, Optional, Tuple, Sequence, Any
 
+from sqlalchemy import Float, cast, exists, func, select, true
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.deletion import StudentDeletion
+from src.models.inventory import StudentInventorySummary
 from src.models.student import Student
-from src.schemas.student import StudentCreate, StudentUpdate
+from src.schemas.student import (
+    StudentCreate, StudentUpdate, StudentUpsert, StudentBulkUpdate, StudentOut
+)
+from src.core.cache import entity_cache
 from src.crud.baserepository import BaseRepository
+from src.crud.baseitem import ItemRepository
+from src.crud.filters import RANGE, TEXT
+
+
+def item_stats() -> tuple:
+    """
+    item_count, total_quantity and total_value (price * quantity) of the
+    student, read from student_inventory_summary by primary key. The
+    aggregates over that single row give zeros, not NULL, when it is missing.
+    """
+    return (
+        func.coalesce(func.max(StudentInventorySummary.item_count), 0).label("item_count"),
+        func.coalesce(func.max(StudentInventorySummary.total_quantity), 0).label("total_quantity"),
+        cast(
+            func.coalesce(func.max(StudentInventorySummary.total_value), 0), Float
+        ).label("total_value"),
+    )
+
+
+def _stats_lateral():
+    # exactly one row per student, correlated to students.id
+    return (
+        select(*item_stats())
+        .where(StudentInventorySummary.student_id == Student.id)
+        .lateral("stats")
+    )
 
 
 class StudentRepository(BaseRepository[Student]):
@@ -13,17 +46,129 @@ class StudentRepository(BaseRepository[Student]):
     Student-specific repository – inherits common CRUD from BaseRepository
     """
 
+    filterable = {
+        "name": TEXT,
+        "age": RANGE,
+        "grade": TEXT,
+    }
+
+    out_schema = StudentOut
+    cache = entity_cache()
+
+    # ?with=stats on the list
+    computed = {"stats": _stats_lateral}
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, Student)
 
+    def _visible(self) -> tuple:
+        # a student whose background deletion is running reads as gone
+        # (an index probe of ux_student_deletions_running)
+        return (
+            ~exists().where(
+                StudentDeletion.student_id == Student.id, StudentDeletion.status == "running"
+            ),
+        )
+
+    def _delete_weight(self):
+        # the student and its items, counted by student_inventory_summary
+        return 1 + func.coalesce(
+            select(StudentInventorySummary.item_count)
+            .where(StudentInventorySummary.student_id == Student.id)
+            .scalar_subquery(),
+            0,
+        )
+
+    def invalidate_deleted(self, ids) -> None:
+        ids = list(ids)
+        super().invalidate_deleted(ids)
+        # their items went with ON DELETE CASCADE; we don't know which ids
+        ItemRepository.invalidate_parents(ids)
+
     async def create(self, student_data: StudentCreate) -> Student:
         return await super().create(student_data.model_dump())
 
-    async def get_by_id(self, student_id: int) -> Optional[Student]:
-        return await super().get_by_id(student_id)
+    async def create_many(self, students: List[StudentCreate]) -> List[Student]:
+        return await super().create_many([student.model_dump() for student in students])
+
+    async def get_by_id(self, student_id: int, include: Sequence[str] = ()) -> Optional[Student]:
+        return await super().get_by_id(student_id, include=include)
+
+    async def get_many(self, student_ids: List[int]) -> List[Student]:
+        return await super().get_many(student_ids)
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+        computed: Sequence[str] = (),
+    ) -> List[Student]:
+        return await super().get_all(
+            skip=skip, limit=limit, order_by_column=order_by, fields=fields, where=where,
+            include=include, computed=computed,
+        )
+
+    async def get_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+        include: Sequence[str] = (),
+        computed: Sequence[str] = (),
+    ) -> Tuple[List[Student], Optional[str]]:
+        return await super().get_page(
+            limit=limit, cursor=cursor, order_by=order_by, fields=fields, where=where,
+            include=include, computed=computed,
+        )
+
+    async def get_all_json(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int]:
+        return await super().get_all_json(
+            skip=skip, limit=limit, order_by_column=order_by, fields=fields, where=where
+        )
 
-    async def get_all(self, skip: int = 0, limit: int = 50) -> List[Student]:
-        return await super().get_all(skip=skip, limit=limit)
+    async def get_page_json(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by="id",
+        fields: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Tuple[bytes, int, Optional[str]]:
+        return await super().get_page_json(
+            limit=limit, cursor=cursor, order_by=order_by, fields=fields, where=where
+        )
+
+    async def summaries(self, student_ids: List[int]) -> List[Row]:
+        """
+        (student_id, item_count, total_quantity, total_value) per student,
+        one primary-key lookup in student_inventory_summary each. Students
+        without items get zeros; unknown ids and students being deleted are
+        skipped. Ordered by student id.
+        """
+        if not student_ids:
+            return []
+        stats = _stats_lateral()
+        stmt = (
+            select(Student.id.label("student_id"), *stats.c)
+            .join(stats, true())
+            .where(self._id_in(student_ids), *self._visible())
+            .order_by(Student.id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
 
     async def update(
         self, student_id: int, update_data: StudentUpdate
@@ -31,5 +176,21 @@ class StudentRepository(BaseRepository[Student]):
         values = update_data.model_dump(exclude_unset=True)
         return await super().update(student_id, values)
 
+    async def upsert_many(self, students: List[StudentUpsert]) -> List[Student]:
+        return await super().upsert_many([student.model_dump() for student in students])
+
+    async def update_many(self, updates: List[StudentBulkUpdate]) -> List[Student]:
+        return await super().update_many(
+            [update.model_dump(exclude_unset=True) for update in updates]
+        )
+
     async def delete(self, student_id: int) -> Optional[Student]:
-        return await super().delete(student_id)
\ No newline at end of file
+        return await super().delete(student_id)
+
+    async def delete_many(self, student_ids: List[int]) -> List[int]:
+        return await super().delete_many(student_ids)
+
+    async def delete_where(
+        self, where: dict, chunk_size: Optional[int] = None
+    ) -> List[int]:
+        return await super().delete_where(where, chunk_size=chunk_size)
@@ -0,0 +1,124 @@
+# src/crud/filters.py
+"""
+Query-string filter language for list endpoints.
+
+    ?price[gte]=10&price[lt]=50&student_id=5&name[like]=pen&student_id[in]=1,2
+
+A bare `column=value` means `eq`. Every column/operator pair has to be in the
+repository's `filterable` allowlist; the result is a list of SQLAlchemy
+predicates that can be passed straight to `.where()`.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy.sql.elements import ColumnElement
+
+EQUALITY = {"eq", "ne", "in"}
+RANGE = {"eq", "ne", "gt", "gte", "lt", "lte"}
+TEXT = {"eq", "ne", "in", "like"}
+
+_KEY = re.compile(r"^(?P<column>\w+)\[(?P<op>\w+)\]$")
+
+
+def _coerce(column, raw: str) -> Any:
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            value = datetime.fromisoformat(raw)
+            if value.tzinfo is not None and not column.type.timezone:
+                # naive columns hold UTC; an offset in the value is converted to it
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type is bool:
+            return raw.lower() in ("1", "true", "yes")
+        return python_type(raw)
+    except ValueError as exc:
+        raise ValueError(f"Invalid value for {column.name}: {raw!r}") from exc
+
+
+def _predicate(column, op: str, raw: str) -> ColumnElement:
+    if op == "in":
+        return column.in_([_coerce(column, part) for part in raw.split(",") if part])
+    if op == "like":
+        escaped = raw.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return column.ilike(f"%{escaped}%", escape="\\")
+    value = _coerce(column, raw)
+    return {
+        "eq": column == value,
+        "ne": column != value,
+        "gt": column > value,
+        "gte": column >= value,
+        "lt": column < value,
+        "lte": column <= value,
+    }[op]
+
+
+def compile_filters(
+    model,
+    allowed: Dict[str, Set[str]],
+    params: Iterable[Tuple[str, str]],
+) -> List[ColumnElement]:
+    """
+    Turn query parameters into predicates. Parameters that are neither a
+    column of `model` nor `column[op]` are ignored (they belong to the
+    endpoint: skip, limit, sort, ...). Raises ValueError for anything that
+    targets a column or operator outside `allowed`.
+    """
+    columns = model.__table__.c
+    predicates: List[ColumnElement] = []
+    for key, raw in params:
+        match = _KEY.match(key)
+        if match:
+            name, op = match.group("column"), match.group("op")
+        elif key in columns:
+            name, op = key, "eq"
+        else:
+            continue
+
+        if name not in allowed:
+            raise ValueError(f"Filtering on '{name}' is not allowed")
+        if op not in allowed[name]:
+            raise ValueError(
+                f"Operator '{op}' is not allowed on '{name}' "
+                f"(use one of: {', '.join(sorted(allowed[name]))})"
+            )
+        predicates.append(_predicate(columns[name], op, raw))
+    return predicates
+
+
+def equality_filters(
+    model,
+    allowed: Dict[str, Set[str]],
+    where: Dict[str, Any],
+) -> List[ColumnElement]:
+    """
+    `column == value` predicates for a JSON object such as {"student_id": 5}.
+    Each column needs `eq` in `allowed`; values are coerced to the column
+    type like query-string values. Raises ValueError otherwise.
+    """
+    columns = model.__table__.c
+    usable = sorted(name for name, ops in allowed.items() if "eq" in ops)
+    predicates: List[ColumnElement] = []
+    for name, value in where.items():
+        if name not in usable:
+            hint = f"use one of: {', '.join(usable)}" if usable else "nothing can be filtered here"
+            raise ValueError(f"Filtering on '{name}' is not allowed ({hint})")
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(f"Invalid value for {name}: {value!r}")
+        predicates.append(columns[name] == _coerce(columns[name], str(value)))
+    return predicates
+
+
+def indexed_columns(model) -> Set[str]:
+    """
+    Columns that lead an index (or the primary key) - the only ones an
+    ORDER BY ... LIMIT can be served from without sorting the whole table.
+    """
+    table = model.__table__
+    names = {column.name for column in table.primary_key.columns}
+    for index in table.indexes:
+        names.add(list(index.columns)[0].name)
+    return names
@@ -0,0 +1,51 @@
+# src/crud/jsonsql.py
+"""
+JSON built by Postgres, shaped like our pydantic response schemas.
+
+    SELECT json_agg(json_build_object('id', t.id, 'name', t.name, ...) ORDER BY ...)
+    FROM (SELECT ... LIMIT 50) AS t
+
+The text comes back as one value that can be sent to the client as it is,
+so the worker never builds Python objects for the rows. Keys keep the
+order of `fields` (json_build_object, unlike jsonb, preserves it).
+"""
+from typing import Sequence
+
+from sqlalchemy import DateTime, Text, case, cast, func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def json_value(column) -> ColumnElement:
+    """
+    `column` as it should appear in the JSON: timestamps are rendered like
+    datetime.isoformat() (to_json would trim trailing zeros of the fraction),
+    everything else is left to Postgres.
+    """
+    if isinstance(column.type, DateTime):
+        return func.concat(
+            func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS'),
+            case(
+                (func.to_char(column, "US") != "000000", func.to_char(column, ".US")),
+                else_="",
+            ),
+        )
+    return column
+
+
+def json_object(source, fields: Sequence[str]) -> ColumnElement:
+    """
+    json_build_object('name', source.name, ...) over the columns `fields`.
+    """
+    pairs = []
+    for name in fields:
+        # names are validated column names, so they can be inlined
+        pairs += [literal_column(f"'{name}'"), json_value(source.c[name])]
+    return func.json_build_object(*pairs)
+
+
+def json_array(aggregate) -> ColumnElement:
+    """
+    A json_agg as text ('[]' when there are no rows). Selecting it as text
+    keeps the driver from parsing the JSON on the way in.
+    """
+    return cast(func.coalesce(aggregate, literal_column("'[]'::json")), Text)
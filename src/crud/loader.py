@@ -0,0 +1,120 @@
+# src/crud/loader.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from src.core.config import settings
+
+
+def _bad_key(error: BaseException) -> bool:
+    # errors a single key's value can cause
+    return isinstance(error, (LookupError, ValueError, TypeError))
+
+
+class BatchLoader:
+    """
+    DataLoader-style request coalescing.
+
+    `load(key)` calls made within `window` seconds of each other (or until
+    `max_batch` distinct keys are waiting) are answered by a single
+    `fetch(keys)` call, which must return {key: value}. Keys missing from
+    the result resolve to None. Each waiting coroutine gets its own result.
+    If the batch fails because of a bad key (`bad_key(error)` is true), its
+    keys are fetched one at a time, so the error only reaches the callers
+    of that key. Any other error (connection lost, timeout) reaches every
+    waiter at once: retrying would only fail the same way, key after key.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        max_batch: Optional[int] = None,
+        window: Optional[float] = None,
+        bad_key: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        self.fetch = fetch
+        self.bad_key = bad_key or _bad_key
+        self.max_batch = max_batch or settings.LOADER_MAX_BATCH
+        self.window = settings.LOADER_WINDOW_MS / 1000 if window is None else window
+        self._pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.keys_fetched = 0
+        self.retried_batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            if self.window > 0:
+                self._timer = loop.call_later(self.window, self._dispatch)
+            else:
+                # same event-loop tick
+                self._timer = loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # keep a reference until done so the task isn't garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, List[asyncio.Future]]) -> None:
+        self.batches += 1
+        self.keys_fetched += len(batch)
+        try:
+            found = await self.fetch(list(batch))
+        except Exception as exc:
+            if len(batch) == 1 or not self.bad_key(exc):
+                self._settle(batch, error=exc)
+                return
+            # one bad key can fail the whole query; retry the keys one by
+            # one so only the callers waiting on a bad key get the error
+            self.retried_batches += 1
+            for key, futures in batch.items():
+                try:
+                    found = await self.fetch([key])
+                except Exception as key_exc:
+                    self._settle({key: futures}, error=key_exc)
+                else:
+                    self._settle({key: futures}, found)
+            return
+        self._settle(batch, found)
+
+    @staticmethod
+    def _settle(
+        batch: Dict[Hashable, List[asyncio.Future]],
+        found: Optional[Dict[Hashable, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        for key, futures in batch.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(found.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "keys_fetched": self.keys_fetched,
+            "retried_batches": self.retried_batches,
+            "avg_batch_size": self.keys_fetched / self.batches if self.batches else None,
+            "max_batch": self.max_batch,
+            "window_ms": self.window * 1000,
+        }
@@ -0,0 +1,125 @@
+# src/crud/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, url-safe token holding the sort signature and the
+values of the ordering columns of the last row on a page. The next page is
+fetched with a seek predicate (`WHERE (col, id) > (...)`) instead of OFFSET,
+so every page costs the same no matter how deep the client walks.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+# (column name, descending?)
+SortKey = Tuple[str, bool]
+
+
+def parse_order(model, order_by: Sequence[str] | str = ("id",)) -> List[SortKey]:
+    """
+    Turn ["-created_at", "id"] (or "-created_at,id") into sort keys.
+    `id` is always appended as the tie-breaker so the order is total.
+    """
+    if isinstance(order_by, str):
+        order_by = [part for part in order_by.split(",") if part.strip()]
+
+    keys: List[SortKey] = []
+    for raw in order_by:
+        raw = raw.strip()
+        desc = raw.startswith("-")
+        name = raw.lstrip("+-")
+        if name not in model.__table__.c:
+            raise ValueError(f"Unknown sort column: {name}")
+        if any(existing == name for existing, _ in keys):
+            continue
+        keys.append((name, desc))
+
+    if not any(name == "id" for name, _ in keys):
+        keys.append(("id", keys[-1][1] if keys else False))
+    return keys
+
+
+def order_signature(keys: Sequence[SortKey]) -> str:
+    return ",".join(("-" if desc else "") + name for name, desc in keys)
+
+
+def order_clauses(model, keys: Sequence[SortKey], source=None) -> List[ColumnElement]:
+    # `source`: a subquery over the model's columns to order by instead
+    columns = (model.__table__ if source is None else source).c
+    return [columns[name].desc() if desc else columns[name].asc() for name, desc in keys]
+
+
+def seek_predicate(model, keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """
+    Rows strictly after `values` in the given order.
+
+    When every key sorts the same way this is a single row-value comparison,
+    which Postgres can answer straight from a matching composite index.
+    Mixed directions fall back to the expanded OR form.
+    """
+    columns = [model.__table__.c[name] for name, _ in keys]
+    directions = {desc for _, desc in keys}
+
+    if len(directions) == 1:
+        desc = directions.pop()
+        left, right = tuple_(*columns), tuple_(*values)
+        return left < right if desc else left > right
+
+    branches = []
+    for i, ((_, desc), column) in enumerate(zip(keys, columns)):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if desc else column > values[i]
+        branches.append(and_(*equal_prefix, step))
+    return or_(*branches)
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _load_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(keys: Sequence[SortKey], row) -> str:
+    payload = {
+        "o": order_signature(keys),
+        "k": [_dump_value(getattr(row, name)) for name, _ in keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(model, keys: Sequence[SortKey], cursor: str) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor` for the same sort order.
+    Raises ValueError if the cursor is malformed or was issued for another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        signature, values = payload["o"], payload["k"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if signature != order_signature(keys) or len(values) != len(keys):
+        raise ValueError("Cursor does not match the requested sort order")
+
+    columns = model.__table__.c
+    try:
+        return [_load_value(columns[name], value) for (name, _), value in zip(keys, values)]
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
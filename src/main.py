@@ -1,11 +1,39 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from typing import Literal
+
+from fastapi import FastAPI, Query
 
 from src.api import students_router, items_router
+from src.api.responses import FastJSONResponse
+from src.crud import ItemRepository, StudentRepository
+from src.crud.baserepository import BaseRepository
+from src.core import cascade_delete
+from src.core.singleflight import flights
+from src.core.database import cache_stats
+from src.core.telemetry import sql_telemetry
+from src.core.replicas import replica_router
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # background student deletions whose worker died (restart, crash)
+    try:
+        await cascade_delete.resume_orphaned()
+    except Exception:
+        # not fatal: the next delete request for such a student resumes it too
+        logger.exception("could not resume student deletion jobs")
+    yield
 
 
 app = FastAPI(
     title="Simple CRUD API",
     description="Learning FastAPI + PostgreSQL by sooooookrat",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 app.include_router(students_router)
@@ -15,3 +43,70 @@ app.include_router(items_router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics/loader")
+async def loader_metrics():
+    """
+    How well concurrent get-by-id lookups are being batched (this worker only)
+    """
+    return {
+        "items": ItemRepository.loader.stats(),
+        "students": StudentRepository.loader.stats(),
+    }
+
+
+@app.get("/metrics/singleflight")
+async def singleflight_metrics():
+    """
+    How many identical list requests shared one query (this worker only)
+    """
+    return {name: flight.stats() for name, flight in flights.items()}
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """
+    Hit/miss/eviction counters of the in-process caches (this worker only)
+    """
+    return {
+        "items": ItemRepository.cache.stats() if ItemRepository.cache is not None else None,
+        "students": StudentRepository.cache.stats() if StudentRepository.cache is not None else None,
+        "counts": BaseRepository.count_cache.stats(),
+    }
+
+
+@app.get("/metrics/db-cache")
+async def db_cache_metrics():
+    """
+    Compiled-statement cache hit rate and prepared statement cache settings
+    """
+    return cache_stats()
+
+
+@app.get("/metrics/replicas")
+async def replica_metrics():
+    """
+    Replica health and how reads were spread over them (this worker only)
+    """
+    return replica_router.stats()
+
+
+@app.get("/metrics/sql")
+async def sql_metrics(
+    limit: int = Query(50, ge=1, le=1000),
+    order_by: Literal["total_ms", "mean_ms", "max_ms", "calls", "rows"] = "total_ms",
+):
+    """
+    Per-statement latency histograms, rows returned and the slow-query log
+    (this worker only)
+    """
+    return sql_telemetry.stats(limit=limit, order_by=order_by)
+
+
+@app.delete("/metrics/sql", status_code=204)
+async def reset_sql_metrics():
+    """
+    Start the SQL statistics over, e.g. before a load test (this worker only)
+    """
+    sql_telemetry.reset()
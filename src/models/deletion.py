@@ -0,0 +1,80 @@
+# src/models/deletion.py
+from sqlalchemy import String, Integer, BigInteger, DateTime, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+
+from src.core.database import Base
+
+
+class StudentDeletion(Base):
+    """
+    A background delete of one student (DELETE /students/{id}?mode=async).
+    A "running" row marks the student as being deleted; the row stays
+    after the student is gone so its status can still be read.
+    """
+    __tablename__ = "student_deletions"
+    __table_args__ = (
+        # at most one running deletion per student
+        Index(
+            "ux_student_deletions_running",
+            "student_id",
+            unique=True,
+            postgresql_where=text("status = 'running'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+    )
+    # no foreign key: the student row is deleted by the job itself
+    student_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    # running -> done | failed
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="running",
+    )
+    # items the student had when the job started, from student_inventory_summary
+    items_total: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    items_deleted: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    error: Mapped[Optional[str]] = mapped_column(
+        String(500),
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=func.timezone("utc", func.now()),
+    )
+    # bumped by every batch; a running job that stops bumping it was
+    # orphaned (its worker died) and may be picked up again
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=func.timezone("utc", func.now()),
+        onupdate=func.timezone("utc", func.now()),
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<StudentDeletion(id={self.id}, student_id={self.student_id}, status={self.status!r}, "
+            f"items_deleted={self.items_deleted}/{self.items_total})>"
+        )
@@ -0,0 +1,46 @@
+# src/models/inventory.py
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Integer, Numeric, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class StudentInventorySummary(Base):
+    """
+    Item count, total quantity and total value (price * quantity) per
+    student, kept up to date by triggers on `items` (see create_tables.py)
+    and rebuilt by `python -m src.core.reconcile_inventory`.
+    A student without items may have no row, or a row of zeros.
+    """
+    __tablename__ = "student_inventory_summary"
+
+    student_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("students.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    item_count: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    total_quantity: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    # NUMERIC, not float: the triggers add and subtract deltas forever,
+    # exact arithmetic keeps that equal to a fresh SUM
+    total_value: Mapped[Decimal] = mapped_column(
+        Numeric,
+        nullable=False,
+        default=0,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<StudentInventorySummary(student_id={self.student_id}, item_count={self.item_count}, "
+            f"total_quantity={self.total_quantity}, total_value={self.total_value})>"
+        )
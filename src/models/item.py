@@ -1,5 +1,5 @@
 # src/models/item.py
-from sqlalchemy import String, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -12,6 +12,11 @@ if TYPE_CHECKING:
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # "items of student X" pages (WHERE student_id = X AND id > cursor ORDER BY id)
+        # and the ON DELETE CASCADE from students; Postgres doesn't index FKs by itself
+        Index("ix_items_student_id_id", "student_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -42,19 +47,23 @@ class Item(Base):
         ForeignKey("students.id", ondelete="CASCADE"),
         nullable=False,
     )
+    # Generated by Postgres (UTC) so INSERT/UPDATE ... RETURNING can hand
+    # them back without a second query
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
-        default=datetime.utcnow,
+        index=True,           # lets clients sort/filter by newest without a full sort
+        server_default=func.timezone("utc", func.now()),
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=func.timezone("utc", func.now()),
+        onupdate=func.timezone("utc", func.now()),
     )
     # Relationship: An item belongs to one Student
-    student: Mapped["Student"] = relationship(back_populates="items")
+    # lazy="raise": load it explicitly (repository `include`), never behind our back
+    student: Mapped["Student"] = relationship(back_populates="items", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<Item(id={self.id}, name={self.name!r}, price={self.price}, quantity={self.quantity}, student_id={self.student_id})>"
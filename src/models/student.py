@@ -29,9 +29,19 @@ class Student(Base):
     grade: Mapped[str] = mapped_column(
         String(20),           # e.g. "A+", "B-", "Excellent", etc.
         nullable=False,
+        index=True,           # bulk deletes by grade (POST /students/delete with `where`)
     )
     # Relationship: One student can have many items
-    items: Mapped[list["Item"]] = relationship("Item", back_populates="student", cascade="all, delete-orphan")
+    # lazy="raise": load them explicitly (repository `include`), never behind our back;
+    # passive_deletes: ON DELETE CASCADE removes them, no need to load them first
+    items: Mapped[list["Item"]] = relationship(
+        "Item",
+        back_populates="student",
+        cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True,
+        order_by="Item.id",
+    )
 
     def __repr__(self) -> str:
         return f"<Student(id={self.id}, name={self.name!r}, age={self.age}, grade={self.grade!r})>"
\ No newline at end of file
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Optional
+
+from src.schemas.ids import Id
+
+
+class BulkDelete(BaseModel):
+    ids: Optional[List[Id]] = Field(None, min_length=1)
+    where: Optional[Dict[str, Any]] = Field(
+        None,
+        min_length=1,
+        description="Equality filter on filterable, indexed columns, e.g. {\"student_id\": 5}",
+    )
+    chunk_size: Optional[int] = Field(
+        None,
+        gt=0,
+        le=100000,
+        description="Rows per transaction, including those removed by ON DELETE CASCADE",
+    )
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.ids is None) == (self.where is None):
+            raise ValueError("Provide exactly one of 'ids' or 'where'")
+        return self
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
+    ids: List[Id]
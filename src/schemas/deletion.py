@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class StudentDeletionOut(BaseModel):
+    id: int = Field(..., description="job id, for GET /students/deletions/{id}")
+    student_id: int
+    status: Literal["running", "done", "failed"]
+    items_total: int = Field(..., description="items the student had when the job started")
+    items_deleted: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
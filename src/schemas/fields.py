@@ -0,0 +1,105 @@
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+
+from src.schemas.pagination import Page
+
+
+def parse_fields(schema: Type[BaseModel], raw: str) -> Tuple[str, ...]:
+    """
+    Parse a `?fields=id,name,price` value against the fields of `schema`.
+    `id` is always included. Raises ValueError for unknown names.
+    """
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    requested.add("id")
+    # keep the schema's field order so responses look like the full model
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dump_list(model: Type[BaseModel], items: list, page: Optional[dict] = None) -> bytes:
+    """
+    Serialize ORM objects or dicts as a JSON list of `model`, or - with `page`
+    (next_cursor, total, ...) - as a Page envelope.
+    """
+    if page is not None:
+        envelope = Page[model].model_validate({"items": items, **page}, from_attributes=True)
+        return envelope.model_dump_json().encode()
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def list_data(model: Type[BaseModel], items: list, page: Optional[dict] = None) -> Any:
+    """
+    dump_list's document as Python objects (dicts and lists, datetimes left
+    as they are), for FastJSONResponse; a binary codec packs it directly.
+    """
+    if page is not None:
+        return Page[model].model_validate({"items": items, **page}, from_attributes=True).model_dump()
+    adapter = _list_adapter(model)
+    return adapter.dump_python(adapter.validate_python(items, from_attributes=True))
+
+
+def _row_dicts(fields: Tuple[str, ...], rows: list) -> List[dict]:
+    if not rows:
+        return []
+    # positions resolved once per page, not once per row
+    positions = [(name, rows[0]._fields.index(name)) for name in fields]
+    return [{name: row[i] for name, i in positions} for row in rows]
+
+
+def dump_rows(fields: Tuple[str, ...], rows: list, page: Optional[dict] = None) -> bytes:
+    """
+    Serialize column-only rows (the repository's `fields=` mode) straight to
+    JSON bytes with keys `fields`, as a list or - with `page` - a Page envelope.
+    There is no model validation: the columns are NOT NULL and typed by the
+    database, so they already match the response schema. Other selected
+    columns (e.g. sort keys) are left out.
+    """
+    return to_json(row_data(fields, rows, page))
+
+
+def row_data(fields: Tuple[str, ...], rows: list, page: Optional[dict] = None) -> Any:
+    """
+    dump_rows' document as Python objects, for FastJSONResponse.
+    """
+    items = _row_dicts(fields, rows)
+    if page is not None:
+        return {"items": items, **page}
+    return items
+
+
+def encode_rows(fields: Tuple[str, ...], rows: list, ndjson: bool) -> bytes:
+    """
+    One chunk of a streamed list: newline-terminated JSON objects for NDJSON,
+    or comma-separated objects (no brackets) to splice into a JSON array.
+    """
+    items = _row_dicts(fields, rows)
+    if ndjson:
+        return b"".join(to_json(item) + b"\n" for item in items)
+    return to_json(items)[1:-1]
+
+
+def pack_rows(fields: Tuple[str, ...], rows: list, dumps: Callable[[Any], bytes]) -> bytes:
+    """
+    One chunk of a binary (MessagePack/CBOR) stream: the rows as consecutive
+    objects, with the same values as the JSON encoding (ISO timestamps).
+    """
+    return b"".join(dumps(item) for item in to_jsonable_python(_row_dicts(fields, rows)))
+
+
+def wrap_page(items: bytes, page: dict) -> bytes:
+    """
+    A Page envelope around an already encoded JSON array of items
+    (e.g. one built by Postgres).
+    """
+    return b'{"items":' + items + b"," + to_json(page)[1:]
@@ -0,0 +1,11 @@
+# src/schemas/ids.py
+from typing import Annotated
+
+from pydantic import Field
+
+# ids are Postgres INTEGER columns; a larger value would fail in the driver
+# (and take a whole batched lookup down with it) instead of being a 422
+MAX_ID = 2**31 - 1
+
+# a row id in a request body or the query string, e.g. ?ids=1&ids=2
+Id = Annotated[int, Field(ge=1, le=MAX_ID)]
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional
 
+from src.schemas.ids import Id
 
 class ItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -11,7 +12,7 @@ class ItemBase(BaseModel):
 
 
 class ItemCreate(ItemBase):
-    student_id: int = Field(..., gt=0, description="ID of the student who owns this item")
+    student_id: Id = Field(..., description="ID of the student who owns this item")
 
 
 class ItemUpdate(BaseModel):
@@ -19,7 +20,15 @@ class ItemUpdate(BaseModel):
     description: Optional[str] = Field(None, min_length=1, max_length=500)
     price: Optional[float] = Field(None, gt=0)
     quantity: Optional[int] = Field(None, ge=0)
-    student_id: Optional[int] = Field(None, gt=0)
+    student_id: Optional[Id] = None
+
+
+class ItemUpsert(ItemCreate):
+    id: Optional[Id] = Field(None, description="Existing item to overwrite; omit to insert")
+
+
+class ItemBulkUpdate(ItemUpdate):
+    id: Id
 
 
 class ItemOut(ItemBase):
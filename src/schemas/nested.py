@@ -0,0 +1,12 @@
+from src.schemas.item import ItemOut
+from src.schemas.student import StudentOut
+
+
+# responses with a relationship loaded through ?include=
+
+class StudentWithItems(StudentOut):
+    items: list[ItemOut]
+
+
+class ItemWithStudent(ItemOut):
+    student: StudentOut
@@ -1,6 +1,8 @@
 from pydantic import BaseModel ,Field
 from pydantic_settings import  SettingsConfigDict
 
+from src.schemas.ids import Id
+
 
 class StudenBase(BaseModel):
     name:str=Field(...,min_length=3,max_length=50)
@@ -20,7 +22,29 @@ class StudentUpdate(StudenBase):
 
 
 
+class StudentUpsert(StudentCreate):
+    id:Id|None=None
+
+
+class StudentBulkUpdate(StudentUpdate):
+    id:Id
+
+
+
 class StudentOut(StudenBase):
     id:int
 
     model_config=SettingsConfigDict(from_attributes=True)    
+
+
+class StudentSummary(BaseModel):
+    student_id:int
+    item_count:int
+    total_quantity:int
+    total_value:float=Field(...,description="sum of price * quantity")
+
+
+class StudentWithStats(StudentOut):
+    item_count:int
+    total_quantity:int
+    total_value:float
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+# A Postgres URL from the environment enables the database tests
+# (tests/test_*_postgres.py); without one they are skipped.
+POSTGRES_URL = os.environ.get("DATABASE_URL") if os.environ.get("DATABASE_URL", "").startswith(
+    "postgresql"
+) else None
+
+# src.core.config needs a URL at import time; the unit tests never connect to it
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://postgres@localhost/unused")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def pg_session(anyio_backend):
+    """
+    An AsyncSession on the Postgres database from DATABASE_URL, inside a
+    transaction that is rolled back afterwards; repository commits only
+    release savepoints. Skips the test when no such database is configured.
+    """
+    if POSTGRES_URL is None:
+        pytest.skip("needs DATABASE_URL pointing at a Postgres database")
+
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from src.core.create_tables import DELETION_GUARD, INVENTORY_TRIGGERS, UPGRADES
+    from src.core.database import Base
+
+    engine = create_async_engine(POSTGRES_URL)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            # the schema as create_tables.py builds it, rolled back with the rest
+            await conn.run_sync(Base.metadata.create_all)
+            for statement in UPGRADES + INVENTORY_TRIGGERS + DELETION_GUARD:
+                await conn.execute(text(statement))
+            session = AsyncSession(
+                bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+            )
+            try:
+                yield session
+            finally:
+                await session.close()
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
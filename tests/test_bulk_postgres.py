@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from src.core.config import settings
+from src.crud import ItemRepository, StudentRepository
+from src.schemas.item import ItemBulkUpdate, ItemCreate
+from src.schemas.student import StudentCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_update_many_splits_batches_over_the_parameter_limit(pg_session):
+    student = await StudentRepository(pg_session).create(
+        StudentCreate(name="bulk owner", age=20, grade="A")
+    )
+    items = ItemRepository(pg_session)
+    created = await items.create_many([
+        ItemCreate(name=f"item {i}", description="d", price=1, quantity=1, student_id=student.id)
+        for i in range(6000)
+    ])
+
+    # 6 parameters per row: 36,000 in one statement would be refused
+    updated = await items.update_many([
+        ItemBulkUpdate(
+            id=item.id, name="renamed", description="e", price=2, quantity=3, student_id=student.id
+        )
+        for item in reversed(created)
+    ])
+
+    assert [item.id for item in updated] == [item.id for item in reversed(created)]
+    assert {(item.name, item.price, item.quantity) for item in updated} == {("renamed", 2.0, 3)}
+
+
+@pytest.mark.parametrize(
+    "where, message",
+    [
+        ({"student_id": "abc"}, "Invalid value"),
+        ({"description": "d"}, "not allowed"),  # filterable nowhere
+        ({"price": 1}, "not allowed"),  # filterable, but not indexed
+    ],
+)
+async def test_delete_where_rejects_bad_filters(pg_session, where, message):
+    with pytest.raises(ValueError, match=message):
+        await ItemRepository(pg_session).delete_where(where)
+
+
+async def test_delete_where_deletes_in_chunks(pg_session):
+    students = StudentRepository(pg_session)
+    keep, drop = [
+        await students.create(StudentCreate(name=f"owner {i}", age=20, grade="A")) for i in range(2)
+    ]
+    items = ItemRepository(pg_session)
+    created = await items.create_many([
+        ItemCreate(name=f"item {i}", description="d", price=1, student_id=owner.id)
+        for i, owner in enumerate([keep, drop] * 5)
+    ])
+
+    deleted = await items.delete_where({"student_id": str(drop.id)}, chunk_size=2)
+
+    assert sorted(deleted) == sorted(item.id for item in created if item.student_id == drop.id)
+    assert len(await items.get_many([item.id for item in created])) == 5
+
+
+async def test_student_delete_where_sizes_chunks_by_cascaded_items(pg_session, monkeypatch):
+    students = StudentRepository(pg_session)
+    owners = [
+        await students.create(StudentCreate(name=f"owner {i}", age=20, grade="chunked"))
+        for i in range(3)
+    ]
+    await ItemRepository(pg_session).create_many([
+        ItemCreate(name="item", description="d", price=1, student_id=owner.id)
+        for owner, count in zip(owners, [3, 0, 2])
+        for _ in range(count)
+    ])
+    chunks = []
+    monkeypatch.setattr(students, "invalidate_deleted", chunks.append)
+
+    # weights 4, 1 and 3 (the student and its items)
+    deleted = await students.delete_where({"grade": "chunked"}, chunk_size=4)
+
+    assert deleted == [owner.id for owner in owners]
+    assert chunks == [[owners[0].id], [owners[1].id, owners[2].id], []]
+
+
+@pytest.mark.parametrize("count", [9, 10, 11])  # below, at and above the COPY threshold
+@pytest.mark.parametrize(
+    "bad, error",
+    # the INSERT path raises a plain DBAPIError for data errors, COPY its DataError subclass
+    [({"student_id": 2**31 - 1}, IntegrityError), ({"name": "x" * 101}, DBAPIError)],
+)
+async def test_create_many_errors_are_the_same_with_copy(pg_session, monkeypatch, count, bad, error):
+    monkeypatch.setattr(settings, "BULK_COPY_THRESHOLD", 10)
+    student = await StudentRepository(pg_session).create(
+        StudentCreate(name="bulk owner", age=20, grade="A")
+    )
+    rows = [
+        ItemCreate(name=f"item {i}", description="d", price=1, quantity=1, student_id=student.id)
+        for i in range(count)
+    ]
+    rows[-1] = rows[-1].model_copy(update=bad)
+
+    with pytest.raises(error):
+        await ItemRepository(pg_session).create_many(rows)
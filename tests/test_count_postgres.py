@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import select
+
+from src.crud import ItemRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        [("name", "a :b")],
+        [("name[like]", "x :y")],
+        [("name[like]", "it's")],
+        [("student_id[in]", "1,2,3")],
+        [("created_at[gte]", "2024-01-01T10:00:00+02:00")],
+    ],
+)
+@pytest.mark.parametrize("exact", [False, True])
+async def test_count_binds_filter_values(pg_session, params, exact):
+    repo = ItemRepository(pg_session)
+    total, is_exact = await repo.count(repo.build_filters(params), exact=exact)
+    assert total >= 0
+    assert is_exact is exact
+
+
+def test_compile_keeps_named_parameters_as_a_dict():
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects.postgresql.psycopg import PGDialect_psycopg
+
+    session = SimpleNamespace(bind=SimpleNamespace(dialect=PGDialect_psycopg()))
+    repo = ItemRepository(session)
+    stmt = select(repo.model.id).where(*repo.build_filters([("student_id[in]", "1,2")]))
+    sql, parameters = repo._compile(stmt)
+    # a tuple would be taken by exec_driver_sql as executemany
+    assert isinstance(parameters, dict)
+    assert sorted(parameters.values()) == [1, 2]
+    assert all(f"%({name})s" in sql for name in parameters)
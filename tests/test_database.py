@@ -0,0 +1,21 @@
+from src.core.config import settings
+from src.core.database import _connect_args
+
+URL = "postgresql+asyncpg://app@db/app"
+
+
+def test_prepared_statements_are_cached_per_connection():
+    assert _connect_args(URL) == {
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    }
+    assert _connect_args("postgresql+psycopg://app@db/app") == {}
+
+
+def test_cache_size_zero_is_safe_behind_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", 0)
+    args = _connect_args(URL)
+    # asyncpg's own statement cache too, not only SQLAlchemy's
+    assert args["prepared_statement_cache_size"] == 0
+    assert args["statement_cache_size"] == 0
+    name = args["prepared_statement_name_func"]
+    assert name() != name()
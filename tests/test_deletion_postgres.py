@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.crud import ItemRepository, StudentRepository
+from src.models.deletion import StudentDeletion
+from src.models.student import Student
+from src.schemas.item import ItemCreate, ItemUpdate
+from src.schemas.student import StudentBulkUpdate, StudentCreate, StudentUpdate
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def deleting(pg_session):
+    """
+    (student being deleted, another student, an item of each)
+    """
+    students = StudentRepository(pg_session)
+    doomed, other = [
+        await students.create(StudentCreate(name=f"student {i}", age=20, grade="deleting"))
+        for i in range(2)
+    ]
+    doomed_item, other_item = await ItemRepository(pg_session).create_many([
+        ItemCreate(name="item", description="d", price=1, student_id=owner.id)
+        for owner in (doomed, other)
+    ])
+    # a running job, without the task that would carry it out
+    pg_session.add(StudentDeletion(student_id=doomed.id, status="running"))
+    await pg_session.commit()
+    return doomed, other, doomed_item, other_item
+
+
+async def test_items_cannot_be_added_to_a_student_being_deleted(pg_session, deleting):
+    doomed, _, _, _ = deleting
+    with pytest.raises(IntegrityError, match="is being deleted"):
+        await ItemRepository(pg_session).create(
+            ItemCreate(name="late", description="d", price=1, student_id=doomed.id)
+        )
+
+
+async def test_items_cannot_be_moved_to_a_student_being_deleted(pg_session, deleting):
+    doomed, _, doomed_item, other_item = deleting
+    doomed_item_id = doomed_item.id  # the rollback expires the objects
+    items = ItemRepository(pg_session)
+    with pytest.raises(IntegrityError, match="is being deleted"):
+        await items.update(other_item.id, ItemUpdate(student_id=doomed.id))
+    await pg_session.rollback()
+
+    # its own items can still change; they are deleted anyway
+    renamed = await items.update(doomed_item_id, ItemUpdate(name="renamed"))
+    assert renamed.name == "renamed"
+
+
+async def test_student_being_deleted_reads_as_missing(pg_session, deleting):
+    doomed, other, _, _ = deleting
+    students = StudentRepository(pg_session)
+    assert await students.get_by_id(doomed.id) is None
+    assert [student.id for student in await students.get_many([doomed.id, other.id])] == [other.id]
+    assert [row.student_id for row in await students.summaries([doomed.id, other.id])] == [other.id]
+
+
+async def test_student_being_deleted_is_left_out_of_lists(pg_session, deleting):
+    doomed, other, _, _ = deleting
+    students = StudentRepository(pg_session)
+    where = [Student.id.in_([doomed.id, other.id])]
+    fields = students.row_fields()
+
+    assert [student.id for student in await students.get_all(where=where)] == [other.id]
+    rows, _ = await students.get_page(where=where, fields=fields)
+    assert [row.id for row in rows] == [other.id]
+    body, returned = await students.get_all_json(where=where)
+    assert returned == 1 and json.loads(body)[0]["id"] == other.id
+    body, returned, _ = await students.get_page_json(where=where)
+    assert returned == 1 and json.loads(body)[0]["id"] == other.id
+    streamed = [
+        row.id async for chunk in students.stream(fields=fields, where=where) for row in chunk
+    ]
+    assert streamed == [other.id]
+    assert await students.count(where, exact=True) == (1, True)
+
+    items, _ = await ItemRepository(pg_session).get_page_for_student(doomed.id)
+    assert items == []
+
+
+async def test_student_being_deleted_cannot_be_written(pg_session, deleting):
+    doomed, other, _, _ = deleting
+    doomed_id, other_id = doomed.id, other.id  # the rollbacks expire the objects
+    students = StudentRepository(pg_session)
+    writes = [
+        lambda: students.update(doomed_id, StudentUpdate(name="renamed")),
+        lambda: students.update_many([StudentBulkUpdate(id=doomed_id, grade="B")]),
+        lambda: students.delete(doomed_id),
+        lambda: students.delete_many([doomed_id, other_id]),
+    ]
+    for write in writes:
+        with pytest.raises(IntegrityError, match="is being deleted"):
+            await write()
+        await pg_session.rollback()
+
+    # a filter delete leaves it to its job
+    assert await students.delete_where({"grade": "deleting"}) == [other_id]
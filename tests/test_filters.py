@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.crud.baseitem import ItemRepository
+from src.crud.filters import compile_filters, equality_filters, indexed_columns
+from src.models.item import Item
+
+
+def where(*params):
+    return [
+        str(p.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for p in compile_filters(Item, ItemRepository.filterable, params)
+    ]
+
+
+def test_bare_column_means_eq_and_endpoint_params_are_ignored():
+    assert where(("student_id", "5"), ("limit", "10"), ("sort", "-id")) == ["items.student_id = 5"]
+
+
+def test_operators_and_value_types():
+    assert where(("price[gte]", "10"), ("price[lt]", "50.5"), ("student_id[in]", "1,2")) == [
+        "items.price >= 10.0",
+        "items.price < 50.5",
+        "items.student_id IN (1, 2)",
+    ]
+
+
+def test_datetime_values_are_parsed():
+    (predicate,) = compile_filters(
+        Item, ItemRepository.filterable, [("created_at[gte]", "2024-01-01T10:00:00")]
+    )
+    assert predicate.right.value == datetime(2024, 1, 1, 10, 0)
+
+
+def test_like_escapes_wildcards():
+    (predicate,) = compile_filters(Item, ItemRepository.filterable, [("name[like]", "50%_off")])
+    assert predicate.right.value == "%50\\%\\_off%"
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ([("description", "x")], "not allowed"),
+        ([("student_id[like]", "1")], "Operator 'like'"),
+        ([("price[gte]", "cheap")], "Invalid value for price"),
+        ([("created_at[lt]", "yesterday")], "Invalid value for created_at"),
+    ],
+)
+def test_rejected_filters(params, message):
+    with pytest.raises(ValueError, match=message):
+        compile_filters(Item, ItemRepository.filterable, params)
+
+
+def test_indexed_columns():
+    assert {"id", "name", "created_at", "student_id"} <= indexed_columns(Item)
+    assert "description" not in indexed_columns(Item)
+
+
+def test_equality_filters_coerce_json_values():
+    (predicate,) = equality_filters(Item, ItemRepository.filterable, {"student_id": "5"})
+    assert predicate.right.value == 5
+    (predicate,) = equality_filters(Item, ItemRepository.filterable, {"name": 5})
+    assert predicate.right.value == "5"
+
+
+@pytest.mark.parametrize(
+    "where, message",
+    [
+        ({"student_id": "abc"}, "Invalid value for student_id"),
+        ({"student_id": None}, "Invalid value for student_id"),
+        ({"student_id": [1, 2]}, "Invalid value for student_id"),
+        ({"description": "x"}, "not allowed"),
+    ],
+)
+def test_equality_filters_reject(where, message):
+    with pytest.raises(ValueError, match=message):
+        equality_filters(Item, ItemRepository.filterable, where)
+
+
+@pytest.mark.parametrize("raw", ["2024-01-01T10:00:00+02:00", "2024-01-01T08:00:00Z"])
+def test_aware_datetimes_become_naive_utc(raw):
+    (predicate,) = compile_filters(Item, ItemRepository.filterable, [("updated_at[lt]", raw)])
+    assert predicate.right.value == datetime(2024, 1, 1, 8, 0)
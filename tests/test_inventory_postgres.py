@@ -0,0 +1,155 @@
+import pytest
+from sqlalchemy import Numeric, cast, func, select, update
+
+from src.core.reconcile_inventory import reconcile
+from src.crud import ItemRepository, StudentRepository
+from src.models.inventory import StudentInventorySummary
+from src.models.item import Item
+from src.schemas.item import ItemBulkUpdate, ItemCreate, ItemUpdate, ItemUpsert
+from src.schemas.student import StudentCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def summary(session, student_ids) -> dict:
+    """
+    {student_id: (item_count, total_quantity, total_value)} as the triggers
+    left it; rows of zeros are the same as no row.
+    """
+    rows = await session.execute(
+        select(
+            StudentInventorySummary.student_id,
+            StudentInventorySummary.item_count,
+            StudentInventorySummary.total_quantity,
+            StudentInventorySummary.total_value,
+        ).where(StudentInventorySummary.student_id.in_(student_ids))
+    )
+    return {student_id: tuple(totals) for student_id, *totals in rows if any(totals)}
+
+
+async def from_scratch(session, student_ids) -> dict:
+    rows = await session.execute(
+        select(
+            Item.student_id,
+            func.count(),
+            func.sum(Item.quantity),
+            func.sum(cast(Item.price, Numeric) * Item.quantity),
+        )
+        .where(Item.student_id.in_(student_ids))
+        .group_by(Item.student_id)
+    )
+    return {student_id: tuple(totals) for student_id, *totals in rows}
+
+
+@pytest.fixture
+async def stocked(pg_session):
+    """
+    Three students and their items: two for the first, one for the second,
+    none for the third.
+    """
+    students = await StudentRepository(pg_session).create_many([
+        StudentCreate(name=f"student {i}", age=20, grade="A") for i in range(3)
+    ])
+    first, second, _ = students
+    items = await ItemRepository(pg_session).create_many([
+        ItemCreate(name="a", description="d", price=1.5, quantity=2, student_id=first.id),
+        ItemCreate(name="b", description="d", price=2.25, quantity=4, student_id=first.id),
+        ItemCreate(name="c", description="d", price=10, quantity=1, student_id=second.id),
+    ])
+    return [student.id for student in students], [item.id for item in items]
+
+
+async def test_insert(pg_session, stocked):
+    students, _ = stocked
+    first, second, third = students
+    assert await summary(pg_session, students) == {first: (2, 6, 12), second: (1, 1, 10)}
+
+    await ItemRepository(pg_session).create(
+        ItemCreate(name="d", description="d", price=3, quantity=5, student_id=third)
+    )
+    assert (await summary(pg_session, students))[third] == (1, 5, 15)
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_update_of_price_and_quantity(pg_session, stocked):
+    students, (a, b, _) = stocked
+    first, second, _ = students
+    items = ItemRepository(pg_session)
+    await items.update(a, ItemUpdate(price=4))
+    await items.update_many([ItemBulkUpdate(id=b, quantity=0)])
+    assert await summary(pg_session, students) == {first: (2, 2, 8), second: (1, 1, 10)}
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_rename_changes_nothing(pg_session, stocked):
+    students, (a, _, _) = stocked
+    before = await summary(pg_session, students)
+    await ItemRepository(pg_session).update(a, ItemUpdate(name="renamed"))
+    assert await summary(pg_session, students) == before
+
+
+async def test_moving_an_item_between_students(pg_session, stocked):
+    students, (a, _, c) = stocked
+    first, second, third = students
+    items = ItemRepository(pg_session)
+    await items.update(a, ItemUpdate(student_id=second))
+    # with a new price in the same statement
+    await items.update_many([ItemBulkUpdate(id=c, student_id=third, price=1)])
+    assert await summary(pg_session, students) == {
+        first: (1, 4, 9),
+        second: (1, 2, 3),
+        third: (1, 1, 1),
+    }
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_delete(pg_session, stocked):
+    students, (a, _, c) = stocked
+    first, second, _ = students
+    items = ItemRepository(pg_session)
+    await items.delete(a)
+    await items.delete_many([c])
+    assert await summary(pg_session, students) == {first: (1, 4, 9)}
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_cascade_from_deleting_a_student(pg_session, stocked):
+    students, _ = stocked
+    first, second, _ = students
+    await StudentRepository(pg_session).delete(first)
+    assert await summary(pg_session, students) == {second: (1, 1, 10)}
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_upsert(pg_session, stocked):
+    students, (a, _, _) = stocked
+    first, second, third = students
+    await ItemRepository(pg_session).upsert_many([
+        # overwrites a, moving it to the second student
+        ItemUpsert(id=a, name="a", description="d", price=2, quantity=3, student_id=second),
+        ItemUpsert(name="e", description="d", price=1, quantity=7, student_id=third),
+    ])
+    assert await summary(pg_session, students) == {
+        first: (1, 4, 9),
+        second: (2, 4, 16),
+        third: (1, 7, 7),
+    }
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
+
+
+async def test_reconcile_rebuilds_from_scratch(pg_session, stocked):
+    students, _ = stocked
+    first, second, _ = students
+    await pg_session.execute(
+        update(StudentInventorySummary)
+        .where(StudentInventorySummary.student_id == first)
+        .values(item_count=99, total_value=0)
+    )
+    await pg_session.execute(
+        StudentInventorySummary.__table__.delete()
+        .where(StudentInventorySummary.student_id == second)
+    )
+    assert await summary(pg_session, students) != await from_scratch(pg_session, students)
+
+    await reconcile(await pg_session.connection())
+    assert await summary(pg_session, students) == await from_scratch(pg_session, students)
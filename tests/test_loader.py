@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from src.crud.loader import BatchLoader
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_loads_share_one_fetch():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(sorted(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(fetch, max_batch=100, window=0)
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 2, 3)))
+
+    assert results == [10, 20, 20, None]
+    assert calls == [[1, 2, 3]]
+    assert loader.stats()["requests"] == 4
+
+
+async def test_max_batch_dispatches_early():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(len(keys))
+        return {key: key for key in keys}
+
+    loader = BatchLoader(fetch, max_batch=2, window=10)
+    assert await asyncio.wait_for(
+        asyncio.gather(loader.load(1), loader.load(2)), timeout=1
+    ) == [1, 2]
+    assert calls == [2]
+
+
+async def test_a_failing_batch_is_retried_key_by_key():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(sorted(keys))
+        if 666 in keys:
+            raise ValueError("bad key")
+        return {key: key for key in keys}
+
+    loader = BatchLoader(fetch, max_batch=100, window=0)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(666), loader.load(2), return_exceptions=True
+    )
+
+    assert results[0] == 1 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+    assert calls == [[1, 2, 666], [1], [666], [2]]
+    assert loader.stats()["retried_batches"] == 1
+
+
+async def test_other_errors_fail_the_whole_batch_at_once():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(sorted(keys))
+        raise ConnectionResetError("connection lost")
+
+    loader = BatchLoader(fetch, max_batch=100, window=0)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ConnectionResetError) for result in results)
+    assert calls == [[1, 2]]
+    assert loader.stats()["retried_batches"] == 0
+
+
+def test_repository_retries_keys_only_for_data_errors():
+    from sqlalchemy.exc import DBAPIError, OperationalError
+
+    from src.crud import ItemRepository
+
+    class Orig(Exception):
+        def __init__(self, sqlstate):
+            self.sqlstate = sqlstate
+
+    bad_key = ItemRepository.loader.bad_key
+    # 22003 numeric_value_out_of_range, 08006 connection_failure, 57014 query_canceled
+    assert bad_key(DBAPIError("SELECT", None, Orig("22003")))
+    assert not bad_key(OperationalError("SELECT", None, Orig("08006")))
+    assert not bad_key(DBAPIError("SELECT", None, Orig("57014")))
+    assert not bad_key(DBAPIError("SELECT", None, Orig(None)))
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+
+from src.api import negotiation
+from src.api.negotiation import NegotiatedRoute, codecs, negotiate
+from src.api.responses import FastJSONResponse, ModelResponse
+from src.schemas.item import ItemOut
+
+needs_msgpack = pytest.mark.skipif("application/msgpack" not in codecs, reason="msgpack not installed")
+needs_cbor = pytest.mark.skipif("application/cbor" not in codecs, reason="cbor2 not installed")
+
+
+@pytest.mark.parametrize("accept", [None, "", "application/json", "*/*", "application/*"])
+def test_json_by_default(accept):
+    assert negotiate(accept) is None
+
+
+@needs_msgpack
+def test_msgpack_and_its_alias():
+    assert negotiate("application/msgpack").media_type == "application/msgpack"
+    assert negotiate("application/x-msgpack").media_type == "application/msgpack"
+
+
+@needs_msgpack
+@needs_cbor
+def test_quality_values_decide():
+    assert negotiate("application/json;q=0.5, application/cbor").media_type == "application/cbor"
+    assert negotiate("application/cbor;q=0.2, application/msgpack;q=0.9").media_type == (
+        "application/msgpack"
+    )
+    # equal quality: the first listed wins
+    assert negotiate("application/json, application/cbor") is None
+
+
+def test_nothing_acceptable_is_406():
+    with pytest.raises(HTTPException) as exc:
+        negotiate("text/html, application/json;q=0")
+    assert exc.value.status_code == 406
+
+
+ITEM = {
+    "id": 1, "name": "pen", "description": "blue", "price": 2.5, "quantity": 3, "student_id": 7,
+    "created_at": datetime(2024, 1, 2, 3, 4, 5, 6), "updated_at": datetime(2024, 1, 2, 3, 4, 5),
+}
+
+
+@needs_msgpack
+@pytest.mark.anyio
+async def test_binary_bodies_are_packed_from_the_response_data(monkeypatch):
+    router = APIRouter(route_class=NegotiatedRoute)
+    router.add_api_route("/model", lambda: ModelResponse(ITEM, ItemOut))
+    router.add_api_route("/rows", lambda: FastJSONResponse([ITEM]))
+    app = FastAPI()
+    app.include_router(router)
+
+    def no_json(body):
+        raise AssertionError("the JSON body was parsed back")
+
+    monkeypatch.setattr(negotiation.json, "loads", no_json)
+    expected = {
+        **ITEM, "created_at": "2024-01-02T03:04:05.000006", "updated_at": "2024-01-02T03:04:05",
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        model = await client.get("/model", headers={"accept": "application/msgpack"})
+        rows = await client.get("/rows", headers={"accept": "application/msgpack"})
+
+    assert model.headers["content-type"] == "application/msgpack"
+    assert codecs["application/msgpack"].loads(model.content) == expected
+    assert codecs["application/msgpack"].loads(rows.content) == [expected]
+
+
+@pytest.mark.anyio
+async def test_routes_without_a_body_ignore_an_unsupported_accept():
+    router = APIRouter(route_class=NegotiatedRoute)
+    router.add_api_route("/thing", lambda: None, methods=["DELETE"], status_code=204)
+    router.add_api_route("/thing", lambda: {"id": 1}, methods=["GET"])
+    app = FastAPI()
+    app.include_router(router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        deleted = await client.delete("/thing", headers={"accept": "text/html"})
+        read = await client.get("/thing", headers={"accept": "text/html"})
+
+    assert deleted.status_code == 204 and deleted.content == b""
+    assert read.status_code == 406
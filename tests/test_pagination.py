@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.crud import pagination
+from src.models.item import Item
+from src.models.student import Student  # noqa: F401  (resolves Item.student)
+
+
+def compiled(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+def test_parse_order_appends_id_in_the_last_direction():
+    assert pagination.parse_order(Item, "-created_at") == [("created_at", True), ("id", True)]
+    assert pagination.parse_order(Item, ["price", "-id"]) == [("price", False), ("id", True)]
+    assert pagination.parse_order(Item, "name,name") == [("name", False), ("id", False)]
+
+
+def test_parse_order_rejects_unknown_columns():
+    with pytest.raises(ValueError, match="Unknown sort column"):
+        pagination.parse_order(Item, "-secret")
+
+
+def test_cursor_round_trip():
+    keys = pagination.parse_order(Item, "-created_at,price")
+    row = Row(created_at=datetime(2024, 5, 1, 12, 30, 15, 123456), price=9.5, id=42)
+    cursor = pagination.encode_cursor(keys, row)
+
+    assert "=" not in cursor
+    assert pagination.decode_cursor(Item, keys, cursor) == [
+        datetime(2024, 5, 1, 12, 30, 15, 123456), 9.5, 42
+    ]
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = pagination.encode_cursor(pagination.parse_order(Item, "id"), Row(id=1))
+    with pytest.raises(ValueError, match="sort order"):
+        pagination.decode_cursor(Item, pagination.parse_order(Item, "-id"), cursor)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "e30", "eyJvIjoiaWQiLCJrIjpbIngiXX0"])
+def test_malformed_cursor_is_rejected(cursor):
+    # e30 = {} ; the last one is {"o":"id","k":["x"]}
+    with pytest.raises(ValueError):
+        pagination.decode_cursor(Item, pagination.parse_order(Item, "id"), cursor)
+
+
+def test_seek_predicate_single_direction_is_a_row_comparison():
+    keys = pagination.parse_order(Item, "-price")
+    sql = compiled(pagination.seek_predicate(Item, keys, [10.0, 7]))
+    assert sql == "(items.price, items.id) < (10.0, 7)"
+
+
+def test_seek_predicate_mixed_directions_expands():
+    keys = pagination.parse_order(Item, "-price,id")
+    sql = compiled(pagination.seek_predicate(Item, keys, [10.0, 7]))
+    assert sql == "items.price < 10.0 OR items.price = 10.0 AND items.id > 7"
+
+
+def test_order_clauses_follow_the_keys():
+    keys = pagination.parse_order(Item, "-created_at")
+    assert [compiled(clause) for clause in pagination.order_clauses(Item, keys)] == [
+        "items.created_at DESC", "items.id DESC"
+    ]
@@ -0,0 +1,34 @@
+import pytest
+from pydantic import ValidationError
+
+from src.schemas.bulk import BulkDelete
+from src.schemas.ids import MAX_ID
+from src.schemas.item import ItemBulkUpdate, ItemUpsert
+from src.schemas.student import StudentBulkUpdate, StudentUpsert
+
+ITEM = {"name": "item", "description": "d", "price": 1, "student_id": 1}
+STUDENT = {"name": "student", "age": 20, "grade": "A"}
+
+
+@pytest.mark.parametrize(
+    "schema, data",
+    [
+        (BulkDelete, {"ids": [1, MAX_ID + 1]}),
+        (ItemUpsert, {**ITEM, "id": MAX_ID + 1}),
+        (ItemUpsert, {**ITEM, "student_id": MAX_ID + 1}),
+        (ItemBulkUpdate, {"id": MAX_ID + 1}),
+        (ItemBulkUpdate, {"id": 1, "student_id": MAX_ID + 1}),
+        (StudentUpsert, {**STUDENT, "id": MAX_ID + 1}),
+        (StudentBulkUpdate, {"id": MAX_ID + 1}),
+    ],
+)
+def test_body_ids_beyond_integer_columns_are_rejected(schema, data):
+    # a 422, not a DataError from the driver
+    with pytest.raises(ValidationError, match="less than or equal"):
+        schema.model_validate(data)
+
+
+def test_body_ids_up_to_the_limit_are_accepted():
+    assert BulkDelete(ids=[MAX_ID]).ids == [MAX_ID]
+    assert ItemUpsert(**ITEM, id=MAX_ID).id == MAX_ID
+    assert ItemUpsert(**ITEM).id is None
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.core.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_identical_calls_share_one_execution():
+    flight = SingleFlight("test.share", window=0)
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert len(runs) == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight("test.keys", window=0)
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))) == [1, 2]
+    assert flight.executions == 2
+
+
+async def test_failures_are_not_reused():
+    flight = SingleFlight("test.failure", window=60)
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await flight.do("key", work)
+    assert await flight.do("key", work) == "ok"
+    # a finished result is reused within the window
+    assert await flight.do("key", work) == "ok"
+    assert len(attempts) == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test.cancel", window=0)
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", work))
+    second = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "done"
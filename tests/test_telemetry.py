@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+from src.core.telemetry import SQLTelemetry, StatementStats, fingerprint, normalize
+
+
+def test_parameters_and_literals_are_replaced():
+    assert normalize(
+        "SELECT items.id FROM items\n  WHERE items.id = $1::INTEGER AND name = 'o''k' LIMIT 10"
+    ) == "SELECT items.id FROM items WHERE items.id = ?::INTEGER AND name = ? LIMIT ?"
+
+
+def test_lists_collapse_whatever_their_length():
+    assert normalize("SELECT a FROM t WHERE id IN ($1, $2, $3)") == (
+        "SELECT a FROM t WHERE id IN (...)"
+    )
+    assert normalize(
+        "INSERT INTO t (a, b) VALUES ($1::VARCHAR, $2), ($3::VARCHAR, $4), ($5::VARCHAR, 0)"
+    ) == "INSERT INTO t (a, b) VALUES (...)"
+
+
+def test_only_values_rows_collapse():
+    assert normalize(
+        "UPDATE t SET a = v.a FROM (VALUES ($1, $2), ($3, $4)) AS v (id, a) WHERE t.id = v.id"
+    ) == "UPDATE t SET a = v.a FROM (VALUES (...)) AS v (id, a) WHERE t.id = v.id"
+    # a select list of parenthesized expressions is not a list of rows
+    assert fingerprint("SELECT coalesce(a, $1), (b) FROM t") != fingerprint(
+        "SELECT coalesce(a, $1), (b), (c) FROM t"
+    )
+
+
+def test_casts_and_identifiers_survive():
+    assert normalize("SELECT x::bigint, ix_items_1 FROM t WHERE a = :a_1") == (
+        "SELECT x::bigint, ix_items_1 FROM t WHERE a = ?"
+    )
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint("SELECT * FROM t WHERE id = $1") == fingerprint("SELECT * FROM t  WHERE id = 42")
+    assert fingerprint("SELECT * FROM t WHERE id = $1") != fingerprint("SELECT * FROM u WHERE id = $1")
+
+
+def test_histogram_and_quantiles():
+    stats = StatementStats("SELECT ?")
+    for ms in (0.5, 0.7, 3, 40, 20000):
+        stats.record(ms, 1)
+    stats.record(2, -1)
+    result = stats.stats()
+    assert result["calls"] == 6
+    assert result["rows"] == 5 and result["rows_per_call"] == 1.0
+    assert result["histogram"]["1"] == 2 and result["histogram"]["+Inf"] == 6
+    assert result["p50_ms"] == 2.5
+    assert result["p99_ms"] is None
+
+
+@pytest.mark.parametrize(
+    "statement, explained",
+    [
+        ("SELECT id FROM items WHERE id = $1", True),
+        ("select id from students where id = $1 for update", False),
+        ("SELECT id FROM students WHERE id = $1 FOR NO KEY UPDATE SKIP LOCKED", False),
+        ("SELECT id FROM students FOR KEY SHARE", False),
+        ("UPDATE items SET name = $1", False),
+    ],
+)
+def test_only_plain_selects_are_explained(statement, explained):
+    assert SQLTelemetry()._should_explain("key", statement) is explained
+
+
+def test_slow_log_leaves_parameters_out_by_default(monkeypatch):
+    telemetry = SQLTelemetry()
+    engine = SimpleNamespace(url=make_url("postgresql+asyncpg://app:secret@db/app"))
+    statement = "SELECT * FROM students WHERE name = $1"
+    key = telemetry.record(statement, 500, 1)
+
+    telemetry.slow_query(engine, key, statement, ("Jane Doe",), 500, 1, False)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_PARAMETERS", True)
+    telemetry.slow_query(engine, key, statement, ("Jane Doe",), 500, 1, False)
+
+    hidden, shown = telemetry.slow_queries
+    assert hidden["parameters"] is None
+    assert shown["parameters"] == "('Jane Doe',)"
+    assert "secret" not in hidden["database"]
@@ -0,0 +1,40 @@
+import pytest
+
+from tests.conftest import POSTGRES_URL
+from src.core.telemetry import SQLTelemetry
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(POSTGRES_URL is None, reason="needs DATABASE_URL pointing at a Postgres database"),
+]
+
+
+@pytest.fixture
+async def engine(anyio_backend):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(POSTGRES_URL)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE SEQUENCE IF NOT EXISTS telemetry_test_seq")
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("DROP SEQUENCE telemetry_test_seq")
+        await engine.dispose()
+
+
+async def test_explain_shows_the_plan(engine):
+    entry = {}
+    await SQLTelemetry()._explain(engine, "SELECT $1::int + 1", (41,), entry)
+    assert "Result" in entry["plan"] and "actual time" in entry["plan"]
+
+
+async def test_explain_cannot_advance_sequences(engine):
+    entry = {}
+    await SQLTelemetry()._explain(engine, "SELECT nextval('telemetry_test_seq')", (), entry)
+    assert entry["plan"].startswith("EXPLAIN failed") and "read-only" in entry["plan"]
+
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("SELECT is_called FROM telemetry_test_seq")
+        assert result.scalar() is False